@@ -0,0 +1 @@
+"""Benchmarks hors ligne (indicateurs et rendu des pages) rejouant des réponses CoinGecko enregistrées."""
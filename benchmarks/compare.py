@@ -0,0 +1,50 @@
+"""
+Compare deux fichiers de résultats de `benchmarks.run`.
+
+    python -m benchmarks.compare AVANT.json APRÈS.json [--threshold 0.10]
+
+Code de sortie 1 si un benchmark ralentit de plus du seuil (médiane).
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, str]:
+    return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10, help="ralentissement toléré (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    old = {_key(r): r for r in before["results"]}
+    regressions = 0
+    print(f"{before['commit']} -> {after['commit']}")
+    for result in after["results"]:
+        previous = old.get(_key(result))
+        if previous is None or not previous["median_s"]:
+            continue
+        ratio = result["median_s"] / previous["median_s"]
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  <-- régression"
+            regressions += 1
+        params = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"{result['name']:<40} {params:<32} {previous['median_s'] * 1000:9.2f} -> "
+              f"{result['median_s'] * 1000:9.2f} ms  x{ratio:.2f}{flag}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
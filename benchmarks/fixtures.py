@@ -0,0 +1,118 @@
+"""
+Rejeu des réponses CoinGecko enregistrées, sans accès réseau.
+
+Les fixtures sont un seul fichier JSON gzip :
+    {"recorded_at": ms, "markets": {devise: [lignes]}, "market_chart": {"crypto/devise": [[ts, prix], …]}}
+Les timestamps sont décalés au moment du rejeu pour que le dernier point tombe sur « maintenant ».
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+from coingecko import CoinGeckoClient, RequestScheduler, set_client
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "coingecko.json.gz")
+FIXTURES_BASE_URL = "https://fixtures.invalid/api/v3"
+
+_CHART = re.compile(r"/coins/([^/]+)/market_chart(/range)?$")
+
+
+def load_fixtures(path: str = FIXTURES_PATH) -> Dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixtures(fixtures: Dict[str, Any], path: str = FIXTURES_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(fixtures, f, separators=(",", ":"))
+
+
+class FixtureReplay:
+    """Réponses CoinGecko reconstruites à partir des fixtures (partagé par l'adaptateur et le serveur local)."""
+
+    def __init__(self, fixtures: Dict[str, Any]):
+        self.fixtures = fixtures
+        self.shift = int(time.time() * 1000) - int(fixtures["recorded_at"])
+
+    def _rows(self, currency: str):
+        markets = self.fixtures["markets"]
+        return markets.get(currency) or markets["usd"]
+
+    def _series(self, coin_id: str, currency: str):
+        series = self.fixtures["market_chart"].get(f"{coin_id}/{currency}") or self.fixtures["market_chart"].get(f"{coin_id}/usd")
+        return None if series is None else [[ts + self.shift, price] for ts, price in series]
+
+    def body(self, path: str, q: Dict[str, str]) -> Optional[Any]:
+        """Corps JSON de la réponse, ou None si l'URL n'existe pas (404)."""
+        if path.endswith("/coins/markets"):
+            rows = self._rows(q.get("vs_currency", "usd"))
+            if q.get("ids"):
+                wanted = set(q["ids"].split(","))
+                rows = [row for row in rows if row["id"] in wanted]
+            else:
+                per_page, page = int(q.get("per_page", 100)), int(q.get("page", 1))
+                rows = rows[(page - 1) * per_page:page * per_page]
+            if q.get("sparkline") == "true":
+                return rows
+            return [{k: v for k, v in row.items() if k != "sparkline_in_7d"} for row in rows]
+        match = _CHART.search(path)
+        if match:
+            series = self._series(match.group(1), q.get("vs_currency", "usd"))
+            if series is None:
+                return None
+            if match.group(2):
+                start, end = float(q["from"]) * 1000, float(q["to"]) * 1000
+            else:
+                end = time.time() * 1000
+                start = end - float(q.get("days", 30)) * 86_400_000
+            return {"prices": [p for p in series if start <= p[0] <= end]}
+        return None
+
+
+class FixtureAdapter(BaseAdapter):
+    """Adaptateur `requests` qui répond à partir des fixtures au lieu du réseau."""
+
+    def __init__(self, fixtures: Dict[str, Any], latency: float = 0.0):
+        super().__init__()
+        self.replay = FixtureReplay(fixtures)
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def send(self, request, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(request.url)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = self.replay.body(url.path, q)
+        resp = requests.Response()
+        resp.request = request
+        resp.url = request.url
+        resp.status_code = 200 if body is not None else 404
+        resp._content = json.dumps(body if body is not None else {"error": "not found"}).encode()
+        resp.headers["Content-Type"] = "application/json"
+        resp.encoding = "utf-8"
+        self.requests += 1
+        self.bytes_sent += len(resp._content)
+        return resp
+
+    def close(self):
+        pass
+
+
+def install_fixture_client(fixtures: Optional[Dict[str, Any]] = None, latency: float = 0.0) -> FixtureAdapter:
+    """Remplace le client CoinGecko partagé par un client qui rejoue les fixtures (sans quota)."""
+    adapter = FixtureAdapter(fixtures or load_fixtures(), latency)
+    client = CoinGeckoClient(FIXTURES_BASE_URL, scheduler=RequestScheduler(rate_per_minute=10**9, burst=10**6))
+    client.session.mount("https://", adapter)
+    set_client(client)
+    return adapter
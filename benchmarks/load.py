@@ -0,0 +1,93 @@
+"""
+Test de charge du client CoinGecko contre le serveur local (ou toute URL compatible).
+
+    python -m benchmarks.load --latency 0.1 --error-rate 0.05 --throttle-rate 0.02 --concurrency 16 --requests 2000
+    python -m benchmarks.load --url http://127.0.0.1:8000/api/v3 --rate 600
+
+Sans --url, un serveur local est démarré dans le processus avec les options d'injection.
+Affiche le débit et la latence p50/p95/p99 vue par le client (nouvelles tentatives comprises).
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+import numpy as np
+
+from coingecko import CoinGeckoClient, CoinGeckoError, RequestScheduler
+
+from . import mock_server
+
+
+def _workload(client: CoinGeckoClient, coins: List[str], rnd: random.Random) -> Callable[[], object]:
+    """Mélange proche des pages : surtout de l'historique, un peu de /coins/markets."""
+    roll = rnd.random()
+    coin = rnd.choice(coins)
+    if roll < 0.2:
+        return lambda: client.coins_markets("usd", per_page=100)
+    if roll < 0.3:
+        now = time.time()
+        return lambda: client.market_chart_range(coin, "usd", now - 6 * 3600, now)
+    return lambda: client.market_chart(coin, "usd", rnd.choice([7, 30]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="API à tester (sinon serveur local intégré)")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10**6, help="quota client en requêtes par minute")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        settings = mock_server.MockSettings(args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                                            args.rate_limit, retry_after=1, seed=args.seed)
+        server = mock_server.start(settings=settings)
+        url = server.base_url
+
+    client = CoinGeckoClient(url, pool_size=args.concurrency,
+                             scheduler=RequestScheduler(rate_per_minute=args.rate, burst=args.concurrency))
+    coins = [row["id"] for row in client.coins_markets("usd", per_page=250)]
+    if server is not None:
+        coins = [c for c in coins if f"{c}/usd" in server.replay.fixtures["market_chart"]]
+    rnd = random.Random(args.seed)
+    calls = [_workload(client, coins, rnd) for _ in range(args.requests)]
+
+    outcomes: Counter = Counter()
+
+    def timed(call) -> float:
+        t0 = time.perf_counter()
+        try:
+            call()
+            outcomes["ok"] += 1
+        except CoinGeckoError as e:
+            outcomes[type(e).__name__] += 1
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = np.array(list(pool.map(timed, calls)))
+    elapsed = time.perf_counter() - t0
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    print(f"{args.requests} requêtes en {elapsed:.2f} s -> {args.requests / elapsed:.1f} req/s")
+    print(f"latence p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, max {latencies.max() * 1000:.1f} ms")
+    print("résultats : " + ", ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+    if server is not None:
+        print("serveur : " + ", ".join(f"HTTP {code} {n}" for code, n in sorted(server.stats.items())))
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
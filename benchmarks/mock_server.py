@@ -0,0 +1,173 @@
+"""
+Serveur HTTP local qui imite l'API CoinGecko, pour les tests de charge et le travail hors ligne.
+
+    python -m benchmarks.mock_server --port 8000 --latency 0.15 --error-rate 0.02 --rate-limit 30
+    COINGECKO_API_URL=http://127.0.0.1:8000/api/v3 streamlit run app.py
+
+Routes : /coins/markets, /coins/{id}/market_chart, /coins/{id}/market_chart/range.
+Données : fixtures enregistrées (`benchmarks.record`) ou générées (`--synthetic`).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import FixtureReplay, load_fixtures
+from .record import synthetic
+
+
+class MockSettings:
+    """Comportement injecté : latence, erreurs 5xx et quota (429)."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        retry_after: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self._window: Dict[int, int] = Counter()
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def status(self) -> int:
+        """Code HTTP à renvoyer avant même de construire la réponse (200 si rien n'est injecté)."""
+        with self._lock:
+            if self.rate_limit is not None:
+                # quota par minute glissante, comme l'API publique
+                minute = int(time.time() // 60)
+                for old in [m for m in self._window if m < minute]:
+                    del self._window[old]
+                self._window[minute] += 1
+                if self._window[minute] > self.rate_limit:
+                    return 429
+            if self.random.random() < self.throttle_rate:
+                return 429
+            if self.random.random() < self.error_rate:
+                return self.random.choice([500, 502, 503])
+        return 200
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, replay: FixtureReplay, settings: MockSettings, prefix: str = "/api/v3"):
+        super().__init__(address, MockHandler)
+        self.replay = replay
+        self.settings = settings
+        self.prefix = prefix.rstrip("/")
+        self.stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def count(self, status: int) -> None:
+        with self._stats_lock:
+            self.stats[status] += 1
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    server: MockServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = url.path
+        if not path.startswith(self.server.prefix + "/"):
+            return self._send(404, {"error": "not found"})
+        path = path[len(self.server.prefix):]
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        settings = self.server.settings
+        delay = settings.delay()
+        if delay:
+            time.sleep(delay)
+        status = settings.status()
+        if status == 429:
+            return self._send(429, {"status": {"error_code": 429, "error_message": "rate limited"}},
+                              {"Retry-After": str(settings.retry_after)})
+        if status != 200:
+            return self._send(status, {"error": "injected failure"})
+
+        body = self.server.replay.body(path, q)
+        if body is None:
+            return self._send(404, {"error": "coin not found"})
+        self._send(200, body)
+
+    def _send(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+        self.server.count(status)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def start(port: int = 0, fixtures: Optional[Dict[str, Any]] = None, settings: Optional[MockSettings] = None,
+          host: str = "127.0.0.1") -> MockServer:
+    """Démarre le serveur dans un thread démon (port 0 = port libre) et le renvoie."""
+    server = MockServer((host, port), FixtureReplay(fixtures or load_fixtures()), settings or MockSettings())
+    threading.Thread(target=server.serve_forever, name="coingecko-mock", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--synthetic", action="store_true", help="données générées au lieu des fixtures")
+    parser.add_argument("--top", type=int, default=250, help="taille de l'univers généré (--synthetic)")
+    parser.add_argument("--days", type=int, default=90, help="profondeur d'historique générée (--synthetic)")
+    parser.add_argument("--latency", type=float, default=0.0, help="latence moyenne en secondes")
+    parser.add_argument("--jitter", type=float, default=0.0, help="variation uniforme de la latence (±s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="part de réponses 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="part de réponses 429 aléatoires")
+    parser.add_argument("--rate-limit", type=float, help="requêtes par minute avant 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="en-tête Retry-After des 429 (s)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    fixtures = synthetic(args.top, args.top, args.days) if args.synthetic else load_fixtures()
+    settings = MockSettings(args.latency, args.jitter, args.error_rate, args.throttle_rate,
+                            args.rate_limit, args.retry_after, args.seed)
+    server = MockServer((args.host, args.port), FixtureReplay(fixtures), settings)
+    print(f"CoinGecko local sur {server.base_url} ({len(fixtures['markets']['usd'])} cryptos)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(", ".join(f"HTTP {code}: {n}" for code, n in sorted(server.stats.items())))
+
+
+if __name__ == "__main__":
+    main()
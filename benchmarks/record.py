@@ -0,0 +1,79 @@
+"""
+Enregistre les fixtures rejouées par les benchmarks.
+
+    python -m benchmarks.record               # depuis l'API CoinGecko (ou COINGECKO_API_URL)
+    python -m benchmarks.record --synthetic   # marche aléatoire déterministe, sans réseau
+"""
+
+import argparse
+import math
+import random
+import time
+
+from coingecko import get_client
+
+from .fixtures import FIXTURES_PATH, save_fixtures
+
+CHART_COINS = ["bitcoin", "ethereum", "solana", "sui"]
+
+
+def record(top: int, charts: int, days: int) -> dict:
+    client = get_client()
+    rows = client.coins_markets("usd", per_page=top, sparkline=True, price_change_percentage="24h,7d,30d")
+    missing = [c for c in CHART_COINS if c not in {r["id"] for r in rows}]
+    if missing:
+        rows += client.coins_markets("usd", ids=missing, sparkline=True, price_change_percentage="24h,7d,30d")
+    chart_ids = list(dict.fromkeys([r["id"] for r in rows[:charts]] + CHART_COINS))
+    market_chart = {
+        f"{coin_id}/usd": client.market_chart(coin_id, "usd", days)["prices"] for coin_id in chart_ids
+    }
+    return {"recorded_at": int(time.time() * 1000), "markets": {"usd": rows}, "market_chart": market_chart}
+
+
+def synthetic(top: int, charts: int, days: int, seed: int = 42) -> dict:
+    rnd = random.Random(seed)
+    now = int(time.time() * 1000)
+    now -= now % 3_600_000
+    names = CHART_COINS + [f"coin-{i:04d}" for i in range(max(0, top - len(CHART_COINS)))]
+    rows, market_chart = [], {}
+    for rank, coin_id in enumerate(names, start=1):
+        price = 60_000 / rank ** 1.5
+        points, p = [], price
+        for h in range(days * 24, -1, -1):
+            p *= math.exp(rnd.gauss(0, 0.006))
+            points.append([now - h * 3_600_000, round(p, 8)])
+        if rank <= charts:
+            market_chart[f"{coin_id}/usd"] = points
+        last, day_ago = points[-1][1], points[-25][1]
+        rows.append({
+            "id": coin_id,
+            "symbol": coin_id[:4],
+            "name": coin_id.replace("-", " ").title(),
+            "current_price": last,
+            "market_cap": round(last * 1e7 / rank),
+            "market_cap_rank": rank,
+            "total_volume": round(last * 1e6 / rank),
+            "price_change_percentage_24h": round((last / day_ago - 1) * 100, 4),
+            "price_change_percentage_24h_in_currency": round((last / day_ago - 1) * 100, 4),
+            "price_change_percentage_7d_in_currency": round((last / points[-169][1] - 1) * 100, 4),
+            "price_change_percentage_30d_in_currency": round((last / points[0][1] - 1) * 100, 4),
+            "sparkline_in_7d": {"price": [p for _, p in points[-168:]]},
+        })
+    return {"recorded_at": now, "markets": {"usd": rows}, "market_chart": market_chart}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", action="store_true", help="générer des données au lieu d'appeler l'API")
+    parser.add_argument("--top", type=int, default=100, help="lignes /coins/markets")
+    parser.add_argument("--charts", type=int, default=10, help="historiques market_chart enregistrés")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--output", default=FIXTURES_PATH)
+    args = parser.parse_args()
+    fixtures = (synthetic if args.synthetic else record)(args.top, args.charts, args.days)
+    save_fixtures(fixtures, args.output)
+    print(f"{len(fixtures['markets']['usd'])} lignes, {len(fixtures['market_chart'])} historiques -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmarks hors ligne : indicateurs et rendu complet des pages 1 à 8.
+
+    python -m benchmarks.run                      # tout, résultats dans benchmarks/results/<commit>.json
+    python -m benchmarks.run --only indicators
+    python -m benchmarks.compare benchmarks/results/A.json benchmarks/results/B.json
+
+Les appels CoinGecko sont servis par les fixtures enregistrées (`benchmarks.record`).
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from coingecko import collector, store
+from coingecko.indicators import compute_indicators
+from coingecko.streaming import LiveIndicators
+
+from .fixtures import install_fixture_client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SERIES_LENGTHS = [168, 720, 2160]
+COIN_COUNTS = [1, 4, 100, 500]
+PAGES = {str(n) for n in range(1, 9)}
+
+
+def _timeit(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # échauffement
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {"min_s": min(times), "median_s": statistics.median(times), "runs": repeat}
+
+
+def _random_matrix(length: int, coins: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.006, (length, coins)), axis=0))
+    index = pd.date_range("2025-01-01", periods=length, freq="h", name="date")
+    return pd.DataFrame(values, index=index, columns=[f"coin-{i}" for i in range(coins)])
+
+
+def _pandas_loop(matrix: pd.DataFrame) -> None:
+    """Référence : l'ancien calcul, une `pd.Series` par crypto."""
+    for coin in matrix.columns:
+        prices = matrix[coin]
+        ema = lambda s, span: s.ewm(span=span, adjust=False).mean()
+        delta = prices.diff()
+        gain = delta.clip(lower=0).rolling(14).mean()
+        loss = (-delta.clip(upper=0)).rolling(14).mean()
+        _ = 100 - 100 / (1 + gain / loss)
+        _ = ema(prices, 9), ema(prices, 26)
+        macd = ema(prices, 12) - ema(prices, 26)
+        _ = ema(macd, 9)
+        _ = prices.rolling(20).mean(), prices.rolling(20).std()
+
+
+def bench_indicators(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for length in SERIES_LENGTHS:
+        for coins in COIN_COUNTS:
+            matrix = _random_matrix(length, coins)
+            params = {"length": length, "coins": coins}
+            results.append({"name": "indicators.compute_indicators", "params": params,
+                            **_timeit(lambda: compute_indicators(matrix), repeat)})
+            results.append({"name": "indicators.pandas_loop", "params": params,
+                            **_timeit(lambda: _pandas_loop(matrix), repeat)})
+
+    prices = _random_matrix(720, 1).iloc[:, 0].to_numpy()
+
+    def ticks():
+        live = LiveIndicators()
+        for i, price in enumerate(prices):
+            live.tick(i * 3_600_000, price)
+
+    results.append({"name": "streaming.live_indicators_720_ticks", "params": {"length": 720},
+                    **_timeit(ticks, repeat)})
+    return results
+
+
+def _reset_state(tmpdir: str, n: int) -> None:
+    """Repart d'un processus « froid » : pas de collecteur, store vide, caches Streamlit vidés."""
+    import streamlit as st
+
+    if collector._collector is not None:
+        collector._collector.stop()
+    collector._collector = None
+    store._store = store.PriceStore(os.path.join(tmpdir, f"prices-{n}.sqlite"))
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def bench_pages(repeat: int) -> List[Dict[str, Any]]:
+    from streamlit.testing.v1 import AppTest
+
+    adapter = install_fixture_client()
+    pages = sorted(
+        (p for p in glob.glob(os.path.join(ROOT, "pages", "*.py")) if os.path.basename(p).split("_")[0] in PAGES),
+        key=lambda p: int(os.path.basename(p).split("_")[0]),
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n, page in enumerate(pages):
+            name = os.path.basename(page)
+            _reset_state(tmpdir, n)
+            requests_before, bytes_before = adapter.requests, adapter.bytes_sent
+            cold: List[float] = []
+            warm: List[float] = []
+            errors: List[str] = []
+            for run in range(repeat + 1):
+                at = AppTest.from_file(page, default_timeout=120)
+                t0 = time.perf_counter()
+                at.run()
+                (cold if run == 0 else warm).append(time.perf_counter() - t0)
+                errors += [e.value for e in at.exception]
+            results.append({
+                "name": "page.render",
+                "params": {"page": name},
+                "cold_s": cold[0],
+                "min_s": min(warm),
+                "median_s": statistics.median(warm),
+                "runs": repeat,
+                "requests": adapter.requests - requests_before,
+                "bytes": adapter.bytes_sent - bytes_before,
+                "errors": errors[:3],
+            })
+        _reset_state(tmpdir, len(pages))
+    return results
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=ROOT) != 0
+        return sha + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", choices=["indicators", "pages"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="fichier JSON de résultats")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    if args.only in (None, "indicators"):
+        results += bench_indicators(args.repeat)
+    if args.only in (None, "pages"):
+        results += bench_pages(max(1, args.repeat // 2))
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for r in results:
+        params = ", ".join(f"{k}={v}" for k, v in r["params"].items())
+        print(f"{r['name']:<40} {params:<32} {r['median_s'] * 1000:10.2f} ms")
+    print(f"-> {output}")
+
+
+if __name__ == "__main__":
+    main()
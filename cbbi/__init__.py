@@ -0,0 +1,21 @@
+"""Données CBBI (Colin Talks Crypto Bitcoin Bull Run Index) pour la page CBBI."""
+
+from .frame import CBBIData, build_cbbi, fallback_cbbi, section_series
+from .scraper import CBBI_WEB_URL, ScrapedValue, extract_confidence, scrape_confidence
+from .store import CBBIStore, get_store
+from .sync import CBBI_JSON_URL, sync_cbbi
+
+__all__ = [
+    "CBBI_JSON_URL",
+    "CBBI_WEB_URL",
+    "CBBIData",
+    "CBBIStore",
+    "ScrapedValue",
+    "build_cbbi",
+    "extract_confidence",
+    "fallback_cbbi",
+    "get_store",
+    "scrape_confidence",
+    "section_series",
+    "sync_cbbi",
+]
@@ -0,0 +1,74 @@
+"""
+Séries du JSON CBBI en DataFrame colonnaire, converties une seule fois par téléchargement.
+
+Le JSON est de la forme {"Série": {"<timestamp UNIX>": valeur, …}, …} ; les clés
+sont converties en bloc (`pd.to_datetime(unit="s")`) au lieu d'une boucle Python.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class CBBIData:
+    """CBBI prêt à afficher, partagé tel quel entre les reruns (à ne pas modifier)."""
+
+    # index : dates UTC naïves, une colonne numérique par série
+    frame: pd.DataFrame
+    # toutes les clés du JSON d'origine
+    sections: Tuple[str, ...] = ()
+    # série -> (dernière valeur, date UTC ou None pour une valeur de secours sans date)
+    latest: Dict[str, Tuple[float, Optional[pd.Timestamp]]] = field(default_factory=dict)
+    # entrées non temporelles (composantes…) telles quelles
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+
+def section_series(section: Mapping[str, Any], name: str) -> pd.Series:
+    """Une série du JSON : clés timestamp (secondes) ou dates texte, valeurs numériques."""
+    if not section:
+        return pd.Series(dtype=float, name=name)
+    try:
+        # Cas courant (nombres et null) : conversion directe en C
+        values = np.array(list(section.values()), dtype=float)
+    except (TypeError, ValueError):
+        values = pd.to_numeric(pd.Series(list(section.values()), dtype=object), errors="coerce").to_numpy(dtype=float)
+    try:
+        # Cas courant : timestamps entiers en secondes
+        seconds = np.fromiter(map(int, section.keys()), dtype=np.int64, count=len(section))
+        dates = seconds.astype("datetime64[s]").astype("datetime64[ns]")
+    except ValueError:
+        # Clés mixtes : timestamps d'abord, puis dates texte converties ensemble ; le reste est ignoré
+        keys = pd.Index(list(section.keys()), dtype=object)
+        seconds = pd.to_numeric(keys, errors="coerce").to_numpy(dtype=float)
+        dates = pd.to_datetime(seconds, unit="s").to_numpy()
+        texts = np.isnan(seconds)
+        if texts.any():
+            dates[texts] = pd.to_datetime(keys[texts], errors="coerce", format="mixed").tz_localize(None).to_numpy()
+    valid = ~np.isnat(dates)
+    series = pd.Series(values[valid], index=pd.DatetimeIndex(dates[valid]), name=name)
+    return series.sort_index()
+
+
+def fallback_cbbi(value: float, scraped_at: Optional[pd.Timestamp] = None) -> CBBIData:
+    """Seule valeur « Confidence » obtenue par scrapping HTML, sans historique."""
+    return CBBIData(pd.DataFrame(), ("Confidence",), {"Confidence": (value, scraped_at)})
+
+
+def build_cbbi(
+    frame: pd.DataFrame,
+    extras: Optional[Mapping[str, Any]] = None,
+    sections: Optional[Iterable[str]] = None,
+) -> CBBIData:
+    """CBBIData à partir d'un DataFrame déjà construit (JSON ou store local)."""
+    extras = dict(extras or {})
+    if sections is None:
+        sections = [*frame.columns, *extras]
+    latest = {}
+    for name in frame.columns:
+        known = frame[name].dropna()
+        if not known.empty:
+            latest[name] = (float(known.iloc[-1]), known.index[-1])
+    return CBBIData(frame, tuple(sorted(sections)), latest, extras)
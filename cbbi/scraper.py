@@ -0,0 +1,125 @@
+"""
+Secours HTML : valeur « Confidence » extraite de la page CBBI en streaming.
+
+La page est lue par morceaux dans le parseur HTML de lxml (libxml2) et le
+téléchargement s'arrête dès que la valeur est trouvée. La dernière valeur
+obtenue est conservée dans le store local avec sa date : une source lente ou
+en échec coûte une lecture SQLite au lieu d'un nouveau téléchargement.
+"""
+
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+import pandas as pd
+import requests
+from lxml import etree
+
+from .store import CBBIStore, get_store
+
+CBBI_WEB_URL = "https://colintalkscrypto.com/cbbi/"
+
+# Valeur réutilisée sans requête tant qu'elle a moins de SCRAPE_TTL secondes
+SCRAPE_TTL = 600
+# Après un échec, pas de nouvel essai avant FAILURE_BACKOFF secondes
+FAILURE_BACKOFF = 60
+# (connexion, lecture) puis durée et taille maximales du téléchargement complet
+DEFAULT_TIMEOUT = (3.05, 5)
+MAX_SECONDS = 8
+MAX_BYTES = 2_000_000
+CHUNK_SIZE = 16_384
+
+_TARGET_CLASS = "confidence-score-value"
+
+
+class ScrapedValue(NamedTuple):
+    value: float
+    # date UTC naïve du scrapping réussi
+    scraped_at: pd.Timestamp
+    # None si la valeur vient d'être (ou a récemment été) lue ; sinon l'échec qui a fait retomber sur l'ancienne
+    error: Optional[str] = None
+
+
+def _number(text: Optional[str]) -> Optional[float]:
+    text = (text or "").strip().replace(",", "").replace("%", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _is_target(el) -> bool:
+    return _TARGET_CLASS in (el.get("class") or "").split()
+
+
+def extract_confidence(chunks: Iterable[bytes]) -> Optional[float]:
+    """Premier nombre trouvé : élément de classe `confidence-score-value`, ou élément suivant le texte « Confidence »."""
+    parser = etree.HTMLPullParser(events=("start", "end"))
+    after_label = False
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, el in parser.read_events():
+            if event == "start":
+                # Premier élément ouvert après le libellé « Confidence »
+                if after_label is True:
+                    after_label = el
+                continue
+            if _is_target(el) or el is after_label:
+                value = _number("".join(el.itertext()))
+                if value is not None:
+                    return value
+                after_label = False
+            elif after_label is False and (el.text or "").strip() == "Confidence":
+                after_label = True
+            # Les éléments déjà lus ne servent plus (sauf à l'intérieur d'une cible) : mémoire constante
+            if after_label is False and len(el) and not any(map(_is_target, el.iterancestors())):
+                el.clear(keep_tail=True)
+    return None
+
+
+def _download(url: str, timeout) -> Iterable[bytes]:
+    deadline = time.monotonic() + MAX_SECONDS
+    received = 0
+    with requests.get(url, timeout=timeout, stream=True) as resp:
+        resp.raise_for_status()
+        for chunk in resp.iter_content(CHUNK_SIZE):
+            received += len(chunk)
+            if received > MAX_BYTES or time.monotonic() > deadline:
+                raise TimeoutError(f"page CBBI trop lente ou trop lourde ({received} octets lus)")
+            yield chunk
+
+
+_failed_at = 0.0
+_failed_lock = threading.Lock()
+
+
+def scrape_confidence(
+    store: Optional[CBBIStore] = None,
+    url: str = CBBI_WEB_URL,
+    timeout=DEFAULT_TIMEOUT,
+    max_age: float = SCRAPE_TTL,
+) -> ScrapedValue:
+    """Valeur récente, nouvellement scrappée, ou dernière connue avec l'erreur ; lève l'erreur s'il n'y en a aucune."""
+    global _failed_at
+    store = store or get_store()
+    last = store.last_scraped("Confidence")
+    now = time.time()
+    if last is not None and now - last[1] < max_age:
+        return ScrapedValue(last[0], pd.Timestamp(last[1], unit="s"))
+    with _failed_lock:
+        wait = FAILURE_BACKOFF - (now - _failed_at)
+    try:
+        if wait > 0:
+            raise RuntimeError(f"échec récent, nouvel essai dans {wait:.0f} s")
+        value = extract_confidence(_download(url, timeout))
+        if value is None:
+            raise ValueError("Élément « Confidence » introuvable dans le HTML.")
+    except Exception as e:
+        if wait <= 0:
+            with _failed_lock:
+                _failed_at = now
+        if last is None:
+            raise
+        return ScrapedValue(last[0], pd.Timestamp(last[1], unit="s"), str(e))
+    store.save_scraped("Confidence", value, int(now))
+    return ScrapedValue(value, pd.Timestamp(int(now), unit="s"))
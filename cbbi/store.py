@@ -0,0 +1,175 @@
+"""
+Stockage local (SQLite) de l'historique CBBI, un point par série et par jour.
+
+Les séries survivent aux redémarrages : chaque téléchargement n'ajoute que les
+dates nouvelles, et les validateurs HTTP (ETag / Last-Modified) du dernier
+`latest.json` sont conservés pour la requête conditionnelle suivante.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .frame import CBBIData, build_cbbi, section_series
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "CBBI_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "cbbi.sqlite"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    series TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sections (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    payload TEXT
+);
+CREATE TABLE IF NOT EXISTS validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE TABLE IF NOT EXISTS scraped (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL,
+    scraped_at INTEGER NOT NULL
+);
+"""
+
+
+class CBBIStore:
+    """Points `(série, ts en secondes UTC, valeur)` + sections du JSON + validateurs HTTP par URL
+    + dernières valeurs obtenues par scrapping HTML."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+        # Incrémenté à chaque fusion : le CBBIData reconstruit n'est relu que s'il a changé
+        self._version = 0
+        self._snapshot: Optional[Tuple[int, CBBIData]] = None
+
+    def validators(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """(ETag, Last-Modified) du dernier téléchargement de `url`."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def last_scraped(self, name: str) -> Optional[Tuple[float, int]]:
+        """(valeur, date en secondes UTC) du dernier scrapping réussi, ou None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, scraped_at FROM scraped WHERE name = ?", (name,)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def save_scraped(self, name: str, value: float, scraped_at: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scraped (name, value, scraped_at) VALUES (?, ?, ?)",
+                (name, float(value), int(scraped_at)),
+            )
+
+    def merge(
+        self,
+        data: Mapping[str, Any],
+        url: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> int:
+        """Fusionne un `latest.json` : seules les dates >= au dernier point stocké sont écrites.
+
+        Lève `ValueError` sans rien écrire (ni validateurs) si le JSON ne contient aucune
+        série avec au moins une valeur : une réponse d'erreur ou vide n'efface pas l'historique.
+        """
+        with self._lock:
+            last = dict(self._conn.execute("SELECT series, MAX(ts) FROM points GROUP BY series"))
+        rows = []
+        sections = []
+        populated = False
+        for position, (name, value) in enumerate(data.items()):
+            series = section_series(value, name) if isinstance(value, dict) else pd.Series(dtype=float)
+            if series.empty:
+                sections.append((name, position, json.dumps(value)))
+                continue
+            sections.append((name, position, None))
+            ts = series.index.asi8 // 1_000_000_000
+            known = ~np.isnan(series.to_numpy())
+            populated = populated or bool(known.any())
+            # Le dernier point connu est réécrit : la valeur du jour peut encore bouger
+            keep = (ts >= last.get(name, np.iinfo(np.int64).min)) & known
+            rows.extend(zip([name] * int(keep.sum()), ts[keep].tolist(), series.to_numpy()[keep].tolist()))
+        if not populated:
+            raise ValueError(f"latest.json sans série temporelle ({', '.join(map(str, data)) or 'vide'}) : ignoré")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO points (series, ts, value) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute("DELETE FROM sections")
+            self._conn.executemany(
+                "INSERT INTO sections (name, position, payload) VALUES (?, ?, ?)", sections
+            )
+            # Séries retirées du JSON : leur historique disparaît aussi (graphiques, exports)
+            self._conn.execute(
+                "DELETE FROM points WHERE series NOT IN (SELECT name FROM sections WHERE payload IS NULL)"
+            )
+            if url is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO validators (url, etag, last_modified) VALUES (?, ?, ?)",
+                    (url, etag, last_modified),
+                )
+            self._version += 1
+        return len(rows)
+
+    def load(self) -> CBBIData:
+        """Historique complet en `CBBIData` (relu seulement après une fusion)."""
+        with self._lock:
+            if self._snapshot is not None and self._snapshot[0] == self._version:
+                return self._snapshot[1]
+            version = self._version
+            sections = self._conn.execute("SELECT name, payload FROM sections ORDER BY position").fetchall()
+            points = self._conn.execute("SELECT series, ts, value FROM points").fetchall()
+        extras: Dict[str, Any] = {name: json.loads(payload) for name, payload in sections if payload is not None}
+        if points:
+            long = pd.DataFrame(points, columns=["series", "ts", "value"])
+            frame = long.pivot(index="ts", columns="series", values="value")
+            frame.index = pd.DatetimeIndex(frame.index.to_numpy().astype("datetime64[s]").astype("datetime64[ns]"))
+            frame.columns.name = None
+            # Séries du dernier JSON seulement, dans son ordre
+            frame = frame[[name for name, payload in sections if payload is None and name in frame.columns]]
+        else:
+            frame = pd.DataFrame()
+        cbbi = build_cbbi(frame, extras, [name for name, _ in sections] or None)
+        with self._lock:
+            if self._version == version:
+                self._snapshot = (version, cbbi)
+        return cbbi
+
+
+_store: Optional[CBBIStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> CBBIStore:
+    """Store partagé par tout le processus."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CBBIStore()
+        return _store
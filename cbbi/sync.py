@@ -0,0 +1,49 @@
+"""
+Synchronisation incrémentale du `latest.json` CBBI vers le store local.
+
+GET conditionnel (If-None-Match / If-Modified-Since) : un fichier inchangé
+répond 304 sans corps, et seules les nouvelles dates sont fusionnées sinon.
+"""
+
+from typing import Optional
+
+import requests
+
+from shared.instrumentation import add_bytes, section
+
+from .store import CBBIStore, get_store
+
+CBBI_JSON_URL = "https://colintalkscrypto.com/cbbi/data/latest.json"
+
+DEFAULT_TIMEOUT = 10
+
+
+def sync_cbbi(
+    store: Optional[CBBIStore] = None,
+    url: str = CBBI_JSON_URL,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> int:
+    """Nombre de points écrits (0 si le fichier n'a pas changé).
+
+    Lève `requests.RequestException`, ou `ValueError` pour un JSON sans série (rien n'est alors
+    enregistré, validateurs compris : la requête suivante retélécharge le fichier).
+    """
+    store = store or get_store()
+    etag, last_modified = store.validators(url)
+    headers = {"Accept": "application/json"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    with section("http"):
+        resp = requests.get(url, headers=headers, timeout=timeout)
+    if resp.status_code == 304:
+        return 0
+    resp.raise_for_status()
+    add_bytes(len(resp.content))
+    with section("json"):
+        data = resp.json()
+    if not isinstance(data, dict):
+        raise ValueError("latest.json inattendu : objet JSON attendu")
+    with section("store"):
+        return store.merge(data, url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
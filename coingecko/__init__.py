@@ -0,0 +1,34 @@
+"""Accès partagé à l'API CoinGecko pour toutes les pages."""
+
+from .batch import DEFAULT_MAX_WORKERS, fetch_concurrently
+from .client import (
+    API_BASE_URL,
+    CoinGeckoClient,
+    CoinGeckoError,
+    RateLimitError,
+    get_client,
+    prices_frame,
+    set_client,
+)
+from .collector import MarketCollector, MarketSnapshot, get_collector
+from .history import price_history
+from .scheduler import BACKGROUND, INTERACTIVE, RequestScheduler
+
+__all__ = [
+    "API_BASE_URL",
+    "BACKGROUND",
+    "DEFAULT_MAX_WORKERS",
+    "INTERACTIVE",
+    "CoinGeckoClient",
+    "CoinGeckoError",
+    "MarketCollector",
+    "MarketSnapshot",
+    "RateLimitError",
+    "RequestScheduler",
+    "fetch_concurrently",
+    "get_client",
+    "get_collector",
+    "price_history",
+    "prices_frame",
+    "set_client",
+]
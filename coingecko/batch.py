@@ -0,0 +1,37 @@
+"""
+Téléchargements groupés : plusieurs appels CoinGecko en parallèle.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Hashable, Iterable, Iterator, Tuple, TypeVar
+
+from .client import POOL_SIZE
+
+K = TypeVar("K", bound=Hashable)
+R = TypeVar("R")
+
+# Ne pas dépasser la taille du pool de connexions du client
+DEFAULT_MAX_WORKERS = 8
+
+
+def fetch_concurrently(
+    fetch: Callable[[K], R],
+    keys: Iterable[K],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Iterator[Tuple[K, R]]:
+    """Appelle `fetch(key)` pour chaque clé avec au plus `max_workers` requêtes simultanées.
+
+    Les couples `(key, résultat)` sont renvoyés dans l'ordre d'arrivée, pour que
+    l'appelant puisse afficher la progression (et que `fetch`, si c'est une
+    fonction `st.cache_data`, remplisse le cache au fil de l'eau).
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    workers = max(1, min(max_workers, POOL_SIZE, len(keys)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="coingecko") as pool:
+        # Chaque tâche hérite du contexte de l'appelant (mesures du rerun en cours)
+        futures = {pool.submit(contextvars.copy_context().run, fetch, key): key for key in keys}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
@@ -0,0 +1,117 @@
+"""
+Graphiques des pages d'analyse technique.
+
+- Décimation des séries avant tracé : Largest-Triangle-Three-Buckets (LTTB).
+  On envoie au navigateur un nombre de points adapté à la largeur du graphique
+  au lieu de tout l'historique, en gardant les extrêmes visibles (pics, creux).
+- Une seule figure WebGL par crypto (prix, RSI, MACD) avec un axe des dates commun.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# ~2 px par point sur un graphique pleine largeur
+DEFAULT_POINTS = 300
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des `n_out` points retenus par LTTB (premier et dernier toujours gardés)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # Bucket i = [edges[i], edges[i+1]) ; le dernier « bucket suivant » est le point final
+    every = (n - 2) / (n_out - 2)
+    edges = np.append((np.arange(n_out - 1) * every).astype(np.int64) + 1, n)
+    edges[n_out - 2] = n - 1
+
+    # Moyenne de chaque bucket en une passe ; la boucle ne garde que du calcul scalaire
+    # (les buckets font quelques points : plus rapide en Python pur qu'en tranches NumPy)
+    counts = np.diff(edges)
+    avg_x = (np.add.reduceat(x, edges[:-1]) / counts).tolist()
+    avg_y = (np.add.reduceat(y, edges[:-1]) / counts).tolist()
+    xs, ys, bounds = x.tolist(), y.tolist(), edges.tolist()
+
+    selected = [0] * n_out
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        ax, ay = xs[a], ys[a]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        best, best_area = bounds[i], -1.0
+        for b in range(bounds[i], bounds[i + 1]):
+            # Aire (×2) du triangle (a, b, c)
+            area = abs((ax - cx) * (ys[b] - ay) - (ax - xs[b]) * (cy - ay))
+            if area > best_area:
+                best, best_area = b, area
+        a = best
+        selected[i + 1] = a
+    return np.array(selected, dtype=np.int64)
+
+
+def lttb_union(frame: pd.DataFrame, columns: Sequence[str], max_points: Optional[int] = DEFAULT_POINTS,
+               x: str = "date") -> np.ndarray:
+    """Lignes à garder pour que plusieurs séries partagent les mêmes dates.
+
+    Union des sélections LTTB de chaque colonne, le budget étant réparti entre elles.
+    """
+    if max_points is None or len(frame) <= max_points:
+        return np.arange(len(frame))
+    numeric = frame[x].to_numpy().astype("datetime64[ns]").astype(np.int64)
+    budget = max(3, max_points // len(columns))
+    keep = [np.array([0, len(frame) - 1])]
+    for column in columns:
+        values = frame[column].to_numpy(dtype=float)
+        rows = np.flatnonzero(np.isfinite(values))
+        keep.append(rows[lttb_indices(numeric[rows], values[rows], budget)])
+    return np.unique(np.concatenate(keep))
+
+
+def coin_figure(
+    prices: pd.DataFrame,
+    title: str,
+    max_points: Optional[int] = DEFAULT_POINTS,
+    height: int = 800,
+    template: str = "plotly_dark",
+) -> go.Figure:
+    """Prix + EMA + Bollinger, RSI et MACD d'une crypto dans une seule figure WebGL.
+
+    `prices` : sortie de `coin_frame`. Les trois panneaux partagent l'axe des dates ;
+    toutes les traces reçoivent le même tableau de dates (millisecondes epoch,
+    sérialisé en binaire par Plotly) après une décimation commune.
+    """
+    rows = lttb_union(prices, ["price", "RSI", "MACD"], max_points)
+    view = prices.iloc[rows]
+    dates = view["date"].to_numpy().astype("datetime64[ms]").astype(np.int64).astype(float)
+
+    def line(column: str, name: str, row: int, **style) -> None:
+        fig.add_trace(
+            go.Scattergl(x=dates, y=view[column].to_numpy(dtype=float), mode="lines", name=name, line=style),
+            row=row, col=1,
+        )
+
+    fig = make_subplots(
+        rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.04, row_heights=[0.6, 0.2, 0.2],
+        subplot_titles=(title, "RSI (14 jours)", "MACD & Signal"),
+    )
+    line("price", "Prix", 1, color="white", width=2)
+    line("EMA9", "EMA 9", 1, color="orange")
+    line("EMA26", "EMA 26", 1, color="cyan")
+    line("Upper", "Bande Supérieure", 1, color="gray", dash="dot")
+    line("Lower", "Bande Inférieure", 1, color="gray", dash="dot")
+    line("RSI", "RSI", 2, color="green")
+    fig.add_hline(y=70, line_dash="dot", line_color="red", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dot", line_color="blue", row=2, col=1)
+    line("MACD", "MACD", 3, color="orange")
+    line("Signal", "Signal", 3, color="blue")
+
+    fig.update_xaxes(type="date")
+    fig.update_yaxes(title_text="Prix", row=1, col=1)
+    fig.update_yaxes(range=[0, 100], row=2, col=1)
+    fig.update_layout(template=template, height=height, hovermode="x unified", margin=dict(t=40, b=20))
+    return fig
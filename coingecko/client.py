@@ -0,0 +1,182 @@
+"""
+Client HTTP partagé pour l'API CoinGecko.
+
+Une seule `requests.Session` par processus : les connexions TLS sont gardées
+ouvertes (keep-alive) et réutilisées d'un rerun Streamlit à l'autre. Toutes les
+requêtes passent par le même `RequestScheduler` (quota, priorités, 429), et
+les requêtes identiques simultanées sont regroupées en un seul appel.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.instrumentation import add_bytes, section
+
+from .scheduler import INTERACTIVE, RequestScheduler, backoff_delay, parse_retry_after
+from .singleflight import SingleFlight
+
+# Surchargeable pour viser un serveur local (`python -m benchmarks.mock_server`)
+API_BASE_URL = os.environ.get("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+# (connexion, lecture) en secondes
+DEFAULT_TIMEOUT = (3.05, 10)
+POOL_SIZE = 16
+MAX_RETRIES = 4
+
+
+class CoinGeckoError(Exception):
+    """Erreur renvoyée par l'API CoinGecko (HTTP, réseau ou réponse invalide)."""
+
+
+class RateLimitError(CoinGeckoError):
+    """Quota CoinGecko dépassé (HTTP 429) malgré les nouvelles tentatives."""
+
+
+class CoinGeckoClient:
+    """Client CoinGecko avec pool de connexions, timeouts et limitation de débit."""
+
+    def __init__(
+        self,
+        base_url: str = API_BASE_URL,
+        timeout=DEFAULT_TIMEOUT,
+        pool_size: int = POOL_SIZE,
+        scheduler: Optional[RequestScheduler] = None,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self.session.headers.update({"Accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._flights = SingleFlight("client.inflight")
+
+    def _get(self, path: str, params: Optional[Dict[str, Any]] = None, priority: int = INTERACTIVE) -> Any:
+        """Requêtes identiques simultanées (même chemin, paramètres et priorité) : un seul appel HTTP.
+
+        La priorité fait partie de la clé : une page ne doit pas attendre derrière une requête
+        de fond encore en file, quitte à envoyer le même appel une seconde fois.
+        """
+        key = (path, tuple(sorted((params or {}).items())), priority)
+        return self._flights.do(key, lambda: self._fetch(path, params, priority))
+
+    def _fetch(self, path: str, params: Optional[Dict[str, Any]], priority: int) -> Any:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            last_try = attempt == self.max_retries
+            with section("quota"):
+                self.scheduler.acquire(priority)
+            try:
+                with section("http"):
+                    resp = self.session.get(url, params=params, timeout=self.timeout)
+                add_bytes(len(resp.content))
+            except requests.RequestException as e:
+                if last_try:
+                    raise CoinGeckoError(f"{path} : {e}") from e
+                time.sleep(backoff_delay(attempt))
+                continue
+            if resp.status_code == 429:
+                # Quota atteint : tout le processus attend, pas seulement cette requête
+                delay = parse_retry_after(resp.headers.get("Retry-After"))
+                self.scheduler.pause(delay if delay is not None else backoff_delay(attempt, base=2.0))
+                if last_try:
+                    raise RateLimitError(f"{path} : HTTP 429 (quota dépassé)")
+                continue
+            if resp.status_code >= 500 and not last_try:
+                time.sleep(backoff_delay(attempt))
+                continue
+            break
+        if resp.status_code != 200:
+            raise CoinGeckoError(f"{path} : HTTP {resp.status_code}")
+        try:
+            with section("json"):
+                return resp.json()
+        except ValueError as e:
+            raise CoinGeckoError(f"{path} : réponse JSON invalide") from e
+
+    # --- /coins/markets ---
+    def coins_markets(
+        self,
+        vs_currency: str = "usd",
+        ids: Optional[Sequence[str]] = None,
+        order: str = "market_cap_desc",
+        per_page: int = 100,
+        page: int = 1,
+        sparkline: bool = False,
+        price_change_percentage: Optional[str] = None,
+        priority: int = INTERACTIVE,
+    ) -> List[Dict[str, Any]]:
+        """Données de marché (prix, capitalisation, variations…) pour une liste de cryptos."""
+        params: Dict[str, Any] = {
+            "vs_currency": vs_currency,
+            "order": order,
+            "per_page": per_page,
+            "page": page,
+            "sparkline": str(sparkline).lower(),
+        }
+        if ids:
+            params["ids"] = ",".join(ids)
+        if price_change_percentage:
+            params["price_change_percentage"] = price_change_percentage
+        data = self._get("/coins/markets", params, priority)
+        if not isinstance(data, list):
+            raise CoinGeckoError("/coins/markets : réponse inattendue")
+        return data
+
+    # --- /coins/{id}/market_chart ---
+    def market_chart(
+        self, coin_id: str, vs_currency: str = "usd", days: int = 30, priority: int = INTERACTIVE
+    ) -> Dict[str, List[List[float]]]:
+        """Historique `prices`, `market_caps` et `total_volumes` sur `days` jours."""
+        params = {"vs_currency": vs_currency, "days": days}
+        data = self._get(f"/coins/{coin_id}/market_chart", params, priority)
+        if not isinstance(data, dict) or "prices" not in data:
+            raise CoinGeckoError(f"/coins/{coin_id}/market_chart : réponse inattendue")
+        return data
+
+    # --- /coins/{id}/market_chart/range ---
+    def market_chart_range(
+        self, coin_id: str, vs_currency: str, from_ts: float, to_ts: float, priority: int = INTERACTIVE
+    ) -> Dict[str, List[List[float]]]:
+        """Historique entre deux timestamps UNIX (en secondes)."""
+        params = {"vs_currency": vs_currency, "from": int(from_ts), "to": int(to_ts)}
+        data = self._get(f"/coins/{coin_id}/market_chart/range", params, priority)
+        if not isinstance(data, dict) or "prices" not in data:
+            raise CoinGeckoError(f"/coins/{coin_id}/market_chart/range : réponse inattendue")
+        return data
+
+
+_client: Optional[CoinGeckoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> CoinGeckoClient:
+    """Client partagé par toutes les pages et sessions du processus."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CoinGeckoClient()
+        return _client
+
+
+def set_client(client: CoinGeckoClient) -> None:
+    """Remplace le client partagé (rejeu de fixtures, serveur local…)."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def prices_frame(coin_id: str, vs_currency: str = "usd", days: int = 30, priority: int = INTERACTIVE) -> pd.DataFrame:
+    """Historique des prix : colonnes `timestamp` (ms), `price` et `date`."""
+    data = get_client().market_chart(coin_id, vs_currency, days, priority=priority)
+    prices = pd.DataFrame(data["prices"], columns=["timestamp", "price"])
+    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
+    return prices
@@ -0,0 +1,375 @@
+"""
+Collecteur de données de marché partagé par toutes les sessions et toutes les pages.
+
+Un thread de fond interroge CoinGecko pour l'union des cryptos et devises
+demandées récemment, puis publie un `MarketSnapshot` immuable. Les pages lisent
+l'instantané courant : le nombre d'appels API dépend du nombre d'actifs
+distincts suivis, pas du nombre de sessions ni de pages ouvertes.
+
+Les historiques sont conservés par (crypto, devise) sur la plus longue fenêtre
+demandée : une demande plus courte (14 jours quand 30 sont en mémoire) est
+servie par découpage local, sans appel réseau.
+
+Une donnée périmée (`MAX_AGE`) reste servie immédiatement pendant que le thread
+de fond la rafraîchit (stale-while-revalidate) ; seules une donnée absente ou
+trop vieille (`HARD_MAX_AGE`) font attendre la page.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from shared.instrumentation import record_cache
+
+from .batch import fetch_concurrently
+from .client import CoinGeckoError, get_client
+from .history import DAY_MS, price_history
+from .poller import BackgroundPoller
+from .scheduler import BACKGROUND, INTERACTIVE
+from .singleflight import SingleFlight
+from .store import HOUR_MS
+
+MARKETS_INTERVAL = 60       # rafraîchissement des données de marché (s)
+HISTORY_INTERVAL = 300      # rafraîchissement des historiques (s)
+SUBSCRIPTION_TTL = 900      # un actif non redemandé depuis 15 min n'est plus suivi
+MAX_AGE = 600               # au-delà, une donnée publiée est périmée : servie, mais rafraîchie en fond
+HARD_MAX_AGE = 3600         # au-delà, elle n'est plus servie : la page attend un appel direct
+MAX_PER_PAGE = 250
+PRICE_CHANGE_PERCENTAGE = "24h,7d,30d"
+
+_EMPTY: Mapping = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class History:
+    """Historique figé couvrant `days` jours : tableaux NumPy en lecture seule."""
+
+    fetched_at: float
+    days: int
+    timestamps: np.ndarray
+    prices: np.ndarray
+
+    @classmethod
+    def from_frame(cls, prices: pd.DataFrame, fetched_at: float, days: int) -> "History":
+        ts = prices["timestamp"].to_numpy(dtype="int64", copy=True)
+        values = prices["price"].to_numpy(dtype=float, copy=True)
+        ts.setflags(write=False)
+        values.setflags(write=False)
+        return cls(fetched_at, days, ts, values)
+
+    def covers(self, days: int) -> bool:
+        return self.days >= days
+
+    def frame(self, days: Optional[int] = None) -> pd.DataFrame:
+        """Les `days` derniers jours (tout l'historique par défaut)."""
+        start = 0
+        if days is not None and days < self.days:
+            cutoff = time.time() * 1000 - days * DAY_MS
+            start = int(np.searchsorted(self.timestamps, cutoff - cutoff % HOUR_MS))
+        prices = pd.DataFrame({"timestamp": self.timestamps[start:], "price": self.prices[start:]})
+        prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
+        return prices
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """État publié par le collecteur. Jamais modifié : chaque publication crée un nouvel objet."""
+
+    version: int = 0
+    # devise -> crypto -> (instant, ligne /coins/markets)
+    markets: Mapping[str, Mapping[str, Tuple[float, Mapping[str, Any]]]] = field(default_factory=lambda: _EMPTY)
+    # devise -> (instant, cryptos triées par capitalisation)
+    rankings: Mapping[str, Tuple[float, Tuple[str, ...]]] = field(default_factory=lambda: _EMPTY)
+    # (crypto, devise) -> historique sur la plus longue fenêtre demandée
+    histories: Mapping[Tuple[str, str], History] = field(default_factory=lambda: _EMPTY)
+    # devise -> crypto -> (instant, sparkline 7 j horaire en float32, lecture seule)
+    sparklines: Mapping[str, Mapping[str, Tuple[float, np.ndarray]]] = field(default_factory=lambda: _EMPTY)
+    published_at: float = field(default_factory=time.time)
+
+
+def _freeze_rows(rows: Iterable[Dict[str, Any]], fetched_at: float) -> Dict[str, Tuple[float, Mapping[str, Any]]]:
+    return {
+        row["id"]: (fetched_at, MappingProxyType({k: v for k, v in row.items() if k != "sparkline_in_7d"}))
+        for row in rows
+    }
+
+
+def _freeze_sparklines(rows: Iterable[Dict[str, Any]], fetched_at: float) -> Dict[str, Tuple[float, np.ndarray]]:
+    """`sparkline_in_7d` de chaque ligne en tableau float32 (~4 fois plus compact qu'une liste Python).
+
+    Une sparkline vide chez CoinGecko donne un tableau vide, pas une absence : sinon la crypto
+    semblerait toujours à recharger et chaque rerun referait l'appel `/coins/markets`.
+    """
+    sparklines = {}
+    for row in rows:
+        if "sparkline_in_7d" not in row:
+            continue  # ligne demandée sans sparkline
+        prices = (row["sparkline_in_7d"] or {}).get("price") or ()
+        values = np.asarray(prices, dtype=np.float32)
+        values.setflags(write=False)
+        sparklines[row["id"]] = (fetched_at, values)
+    return sparklines
+
+
+def _chunks(items: Sequence[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield list(items[i:i + size])
+
+
+class MarketCollector:
+    """Possède l'interrogation de CoinGecko pour tout le processus."""
+
+    def __init__(self, interval: float = MARKETS_INTERVAL, history_interval: float = HISTORY_INTERVAL):
+        self.history_interval = history_interval
+        # (erreur, date) du dernier échec de collecte, effacé dès qu'un cycle passe sans erreur
+        self.last_failure: Optional[Tuple[Exception, float]] = None
+        self._snapshot = MarketSnapshot()
+        self._publish_lock = threading.Lock()
+        self._subs_lock = threading.Lock()
+        self._ids: Dict[Tuple[str, str], float] = {}
+        self._tops: Dict[Tuple[str, int, bool], float] = {}
+        self._histories: Dict[Tuple[str, str, int], float] = {}
+        # (devise, sparkline) -> (lignes publiées, classement, sparklines, table) : table colonnaire
+        # du classement, reconstruite seulement quand l'une des sources change
+        self._tables: Dict[Tuple[str, bool], Tuple[Mapping, Tuple[str, ...], Mapping, pd.DataFrame]] = {}
+        self._history_flights = SingleFlight("collector.history.inflight")
+        self._poller = BackgroundPoller(self._collect, interval, name="market-collector")
+
+    # --- publication ---
+
+    def snapshot(self) -> MarketSnapshot:
+        return self._snapshot
+
+    def _publish(
+        self,
+        markets: Optional[Dict[str, Dict[str, Tuple[float, Mapping[str, Any]]]]] = None,
+        rankings: Optional[Dict[str, Tuple[float, Tuple[str, ...]]]] = None,
+        histories: Optional[Dict[Tuple[str, str], History]] = None,
+        sparklines: Optional[Dict[str, Dict[str, Tuple[float, np.ndarray]]]] = None,
+    ) -> MarketSnapshot:
+        with self._publish_lock:
+            current = self._snapshot
+            merged_markets = dict(current.markets)
+            for currency, rows in (markets or {}).items():
+                merged_markets[currency] = MappingProxyType({**current.markets.get(currency, {}), **rows})
+            merged_sparklines = dict(current.sparklines)
+            for currency, lines in (sparklines or {}).items():
+                merged_sparklines[currency] = MappingProxyType({**current.sparklines.get(currency, {}), **lines})
+            self._snapshot = replace(
+                current,
+                version=current.version + 1,
+                markets=MappingProxyType(merged_markets),
+                rankings=MappingProxyType({**current.rankings, **(rankings or {})}),
+                histories=MappingProxyType({**current.histories, **(histories or {})}),
+                sparklines=MappingProxyType(merged_sparklines),
+                published_at=time.time(),
+            )
+            return self._snapshot
+
+    # --- boucle de fond ---
+
+    def _collect(self) -> MarketSnapshot:
+        now = time.time()
+        with self._subs_lock:
+            for subs in (self._ids, self._tops, self._histories):
+                for key in [k for k, t in subs.items() if now - t > SUBSCRIPTION_TTL]:
+                    del subs[key]
+            ids_by_currency: Dict[str, set] = {}
+            for currency, coin_id in self._ids:
+                ids_by_currency.setdefault(currency, set()).add(coin_id)
+            top_by_currency: Dict[str, int] = {}
+            sparkline_currencies = set()
+            for currency, n, sparkline in self._tops:
+                top_by_currency[currency] = max(n, top_by_currency.get(currency, 0))
+                if sparkline:
+                    sparkline_currencies.add(currency)
+            days_by_series: Dict[Tuple[str, str], int] = {}
+            for coin_id, currency, days in self._histories:
+                days_by_series[(coin_id, currency)] = max(days, days_by_series.get((coin_id, currency), 0))
+            snapshot = self._snapshot
+            stale_histories = [
+                (coin_id, currency, days) for (coin_id, currency), days in days_by_series.items()
+                if (coin_id, currency) not in snapshot.histories
+                or not snapshot.histories[(coin_id, currency)].covers(days)
+                or now - snapshot.histories[(coin_id, currency)].fetched_at > self.history_interval
+            ]
+
+        markets: Dict[str, Dict[str, Tuple[float, Mapping[str, Any]]]] = {}
+        rankings: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        sparklines: Dict[str, Dict[str, Tuple[float, np.ndarray]]] = {}
+        for currency in set(ids_by_currency) | set(top_by_currency):
+            try:
+                rows, ranking = self._fetch_markets(
+                    currency, ids_by_currency.get(currency, ()), top_by_currency.get(currency, 0), BACKGROUND,
+                    sparkline=currency in sparkline_currencies,
+                )
+            except CoinGeckoError as e:
+                self._fail(e)
+                continue
+            markets[currency] = _freeze_rows(rows, now)
+            sparklines[currency] = _freeze_sparklines(rows, now)
+            if ranking is not None:
+                rankings[currency] = (now, ranking)
+
+        histories: Dict[Tuple[str, str], History] = {}
+        for (coin_id, currency, days), prices in fetch_concurrently(self._fetch_history_quietly, stale_histories):
+            if prices is not None:
+                histories[(coin_id, currency)] = History.from_frame(prices, now, days)
+
+        failure = self.last_failure
+        if failure is not None and failure[1] < now:
+            self.last_failure = None
+        return self._publish(markets, rankings, histories, sparklines)
+
+    def _fetch_history_quietly(self, key: Tuple[str, str, int]) -> Optional[pd.DataFrame]:
+        try:
+            return price_history(*key, priority=BACKGROUND)
+        except CoinGeckoError as e:
+            self._fail(e)
+            return None
+
+    def _fail(self, error: Exception) -> None:
+        self.last_failure = (error, time.time())
+
+    @staticmethod
+    def _fetch_markets(
+        currency: str, ids: Iterable[str], top: int, priority: int, sparkline: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, ...]]]:
+        client = get_client()
+        rows: List[Dict[str, Any]] = []
+        ranking = None
+        if top:
+            # Au-delà de 250 lignes : pages de 250 demandées en parallèle
+            per_page = min(top, MAX_PER_PAGE)
+            pages = list(range(1, -(-top // per_page) + 1))
+
+            def fetch_page(page: int) -> List[Dict[str, Any]]:
+                return client.coins_markets(
+                    currency, per_page=per_page, page=page, sparkline=sparkline,
+                    price_change_percentage=PRICE_CHANGE_PERCENTAGE, priority=priority,
+                )
+
+            by_page = dict(fetch_concurrently(fetch_page, pages))
+            rows = [row for page in pages for row in by_page[page]][:top]
+            ranking = tuple(dict.fromkeys(row["id"] for row in rows))
+        missing = sorted(set(ids) - {row["id"] for row in rows})
+        for chunk in _chunks(missing, MAX_PER_PAGE):
+            rows += client.coins_markets(
+                currency, ids=chunk, per_page=MAX_PER_PAGE, sparkline=sparkline,
+                price_change_percentage=PRICE_CHANGE_PERCENTAGE, priority=priority,
+            )
+        return rows, ranking
+
+    # --- lecture par les pages ---
+
+    def markets(self, vs_currency: str, ids: Iterable[str]) -> pd.DataFrame:
+        """Lignes `/coins/markets` des cryptos demandées, triées par capitalisation."""
+        ids = list(ids)
+        now = time.time()
+        with self._subs_lock:
+            for coin_id in ids:
+                self._ids[(vs_currency, coin_id)] = now
+        published = self._snapshot.markets.get(vs_currency, _EMPTY)
+        missing = [i for i in ids if i not in published or now - published[i][0] > HARD_MAX_AGE]
+        record_cache("collector.markets", hit=not missing)
+        if not missing and any(now - published[i][0] > MAX_AGE for i in ids):
+            self.refresh()
+        if missing:
+            rows, _ = self._fetch_markets(vs_currency, missing, 0, INTERACTIVE)
+            published = self._publish(markets={vs_currency: _freeze_rows(rows, now)}).markets[vs_currency]
+        frame = pd.DataFrame([dict(published[i][1]) for i in ids if i in published])
+        if not frame.empty and "market_cap" in frame:
+            frame = frame.sort_values("market_cap", ascending=False, ignore_index=True)
+        return frame
+
+    def top_markets(self, vs_currency: str, n: int, sparkline: bool = False) -> pd.DataFrame:
+        """Les `n` premières cryptos par capitalisation (au-delà de 250 : pages parallèles).
+
+        Avec `sparkline=True`, colonne `sparkline_in_7d` : prix horaires sur 7 jours (float32),
+        livrés par le même appel `/coins/markets`.
+        """
+        now = time.time()
+        with self._subs_lock:
+            self._tops[(vs_currency, n, sparkline)] = now
+        snapshot = self._snapshot
+        fetched_at, ranking = snapshot.rankings.get(vs_currency, (0.0, ()))
+        lines = snapshot.sparklines.get(vs_currency, _EMPTY)
+        stale = len(ranking) < n or now - fetched_at > HARD_MAX_AGE
+        if sparkline and not stale:
+            stale = any(i not in lines or now - lines[i][0] > HARD_MAX_AGE for i in ranking[:n])
+        record_cache("collector.top_markets", hit=not stale)
+        if not stale and now - fetched_at > MAX_AGE:
+            self.refresh()
+        if stale:
+            rows, ranking = self._fetch_markets(vs_currency, (), n, INTERACTIVE, sparkline=sparkline)
+            snapshot = self._publish(
+                markets={vs_currency: _freeze_rows(rows, now)},
+                rankings={vs_currency: (now, ranking)},
+                sparklines={vs_currency: _freeze_sparklines(rows, now)},
+            )
+            lines = snapshot.sparklines.get(vs_currency, _EMPTY)
+        published = snapshot.markets.get(vs_currency, _EMPTY)
+        if not sparkline:
+            lines = _EMPTY
+        cached = self._tables.get((vs_currency, sparkline))
+        if cached is not None and cached[0] is published and cached[1] is ranking and cached[2] is lines:
+            table = cached[3]
+        else:
+            table = pd.DataFrame([dict(published[i][1]) for i in ranking if i in published])
+            if sparkline and not table.empty:
+                table["sparkline_in_7d"] = [lines[i][1] if i in lines else None for i in table["id"]]
+            self._tables[(vs_currency, sparkline)] = (published, ranking, lines, table)
+        return table.iloc[:n].copy()
+
+    def history(self, coin_id: str, vs_currency: str = "usd", days: int = 30, priority: int = INTERACTIVE) -> pd.DataFrame:
+        """Historique horaire : colonnes `timestamp` (ms), `price` et `date`.
+
+        Servi par découpage local si l'historique en mémoire couvre déjà la fenêtre ;
+        sinon la fenêtre la plus large demandée est (re)chargée.
+        """
+        now = time.time()
+        with self._subs_lock:
+            self._histories[(coin_id, vs_currency, days)] = now
+        held = self._snapshot.histories.get((coin_id, vs_currency))
+        stale = held is None or not held.covers(days) or now - held.fetched_at > HARD_MAX_AGE
+        record_cache("collector.history", hit=not stale)
+        if not stale and now - held.fetched_at > MAX_AGE:
+            self.refresh()
+        if stale:
+            wanted = max(days, held.days if held is not None else 0)
+            # Sessions simultanées sur la même série : un seul chargement (les requêtes /range
+            # diffèrent par leur borne `to` et ne seraient pas regroupées par le client)
+            held = self._history_flights.do(
+                (coin_id, vs_currency, wanted), lambda: self._load_history(coin_id, vs_currency, wanted, priority)
+            )
+        return held.frame(days)
+
+    def _load_history(self, coin_id: str, vs_currency: str, days: int, priority: int) -> History:
+        held = History.from_frame(price_history(coin_id, vs_currency, days, priority=priority), time.time(), days)
+        self._publish(histories={(coin_id, vs_currency): held})
+        return held
+
+    def refresh(self) -> None:
+        """Relance la collecte de fond sans attendre l'intervalle."""
+        self._poller.refresh()
+
+    def stop(self) -> None:
+        self._poller.stop()
+
+
+_collector: Optional[MarketCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_collector() -> MarketCollector:
+    """Collecteur unique du processus (démarré au premier appel)."""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            _collector = MarketCollector()
+        return _collector
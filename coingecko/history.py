@@ -0,0 +1,54 @@
+"""
+Historiques de prix incrémentaux : le store local est complété avec le seul
+delta depuis la dernière heure connue (`/market_chart/range`).
+"""
+
+import time
+from typing import Optional
+
+import pandas as pd
+
+from shared.instrumentation import record_cache, section
+
+from .client import get_client, prices_frame
+from .scheduler import INTERACTIVE
+from .store import HOUR_MS, PriceStore, get_store
+
+DAY_MS = 24 * HOUR_MS
+# Au-delà, CoinGecko renvoie des points journaliers et non plus horaires
+MAX_HOURLY_DAYS = 90
+
+
+def price_history(
+    coin_id: str,
+    vs_currency: str = "usd",
+    days: int = 30,
+    priority: int = INTERACTIVE,
+    store: Optional[PriceStore] = None,
+) -> pd.DataFrame:
+    """Historique horaire sur `days` jours : colonnes `timestamp` (ms), `price` et `date`."""
+    if days > MAX_HOURLY_DAYS:
+        return prices_frame(coin_id, vs_currency, days, priority=priority)
+
+    store = store or get_store()
+    client = get_client()
+    now = int(time.time() * 1000)
+    start = now - days * DAY_MS
+
+    coverage = store.coverage(coin_id, vs_currency)
+    full = coverage is None or coverage[0] > start + HOUR_MS or coverage[1] < start
+    record_cache("store.history", hit=not full)
+    if full:
+        # Rien d'exploitable en local : fenêtre complète
+        data = client.market_chart(coin_id, vs_currency, days, priority=priority)
+        store.append(coin_id, vs_currency, data["prices"], covered_from=start)
+    else:
+        # On reprend à l'heure en cours, qui n'était peut-être pas terminée
+        data = client.market_chart_range(coin_id, vs_currency, coverage[1] / 1000, now / 1000, priority=priority)
+        store.append(coin_id, vs_currency, data["prices"])
+
+    with section("store"):
+        rows = store.load(coin_id, vs_currency, start - start % HOUR_MS)
+    prices = pd.DataFrame(rows, columns=["timestamp", "price"])
+    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
+    return prices
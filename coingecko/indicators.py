@@ -0,0 +1,162 @@
+"""
+Indicateurs techniques vectorisés sur une matrice de prix alignée (temps × cryptos).
+
+Chaque indicateur est calculé pour toutes les cryptos à la fois sur la matrice
+(sommes cumulées NumPy, EMA par le noyau `ewm` de pandas), au lieu d'une
+boucle Python par crypto sur une `pd.Series`.
+"""
+
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from shared.instrumentation import section
+
+INDICATORS = ["price", "EMA9", "EMA26", "RSI", "MACD", "Signal", "SMA", "Upper", "Lower", "Vol"]
+
+
+def price_matrix(histories: Mapping[str, pd.DataFrame], freq: str = "h") -> pd.DataFrame:
+    """Aligne des historiques (`date`, `price`) sur une grille commune : index date, une colonne par crypto."""
+    columns = {}
+    for coin_id, prices in histories.items():
+        if prices is None or prices.empty:
+            continue
+        s = prices.set_index("date")["price"]
+        columns[coin_id] = s.groupby(s.index.floor(freq)).last()
+    if not columns:
+        return pd.DataFrame(dtype=float)
+    matrix = pd.DataFrame(columns).sort_index()
+    matrix.index.name = "date"
+    return matrix
+
+
+def sparkline_matrix(sparklines: Mapping[str, Optional[np.ndarray]], freq: str = "h") -> pd.DataFrame:
+    """Matrice de prix à partir des `sparkline_in_7d` de `/coins/markets` (un point par heure).
+
+    Les sparklines n'ont pas de timestamps : elles sont alignées sur leur fin (heure courante).
+    """
+    series = {coin_id: np.asarray(values, dtype=float) for coin_id, values in sparklines.items()
+              if values is not None and len(values)}
+    if not series:
+        return pd.DataFrame(dtype=float)
+    length = max(len(values) for values in series.values())
+    x = np.full((length, len(series)), np.nan)
+    for j, values in enumerate(series.values()):
+        x[length - len(values):, j] = values
+    index = pd.date_range(end=pd.Timestamp.now().floor(freq), periods=length, freq=freq, name="date")
+    return pd.DataFrame(x, index=index, columns=list(series))
+
+
+# --- noyaux NumPy (tableaux 2-D, axe 0 = temps) ---
+
+def _ema(x: np.ndarray, span: int) -> np.ndarray:
+    """EMA (`ewm(span, adjust=False)`), démarrée à la première valeur connue de chaque colonne.
+
+    Récurrence calculée par le noyau compilé de pandas sur toute la matrice : une boucle
+    Python par pas de temps coûtait plus cher que l'ancien calcul par crypto. Les trous
+    (NaN) sont sautés (`ignore_na`) : l'EMA y garde sa dernière valeur.
+    """
+    return pd.DataFrame(x).ewm(span=span, adjust=False, ignore_na=True).mean().to_numpy()
+
+
+def _rolling_sums(x: np.ndarray, window: int):
+    """Sommes glissantes de x et x² ; NaN tant que la fenêtre n'est pas complète."""
+    valid = ~np.isnan(x)
+    filled = np.where(valid, x, 0.0)
+    zeros = np.zeros((1, x.shape[1]))
+    c1 = np.vstack([zeros, np.cumsum(filled, axis=0)])
+    c2 = np.vstack([zeros, np.cumsum(filled * filled, axis=0)])
+    n = np.vstack([zeros, np.cumsum(valid, axis=0)])
+    s1 = np.full(x.shape, np.nan)
+    s2 = np.full(x.shape, np.nan)
+    if x.shape[0] >= window:
+        full = (n[window:] - n[:-window]) == window
+        s1[window - 1:] = np.where(full, c1[window:] - c1[:-window], np.nan)
+        s2[window - 1:] = np.where(full, c2[window:] - c2[:-window], np.nan)
+    return s1, s2
+
+
+def _rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_sums(x, window)[0] / window
+
+
+def _rolling_mean_std(x: np.ndarray, window: int):
+    # Centrage par colonne pour limiter les erreurs d'arrondi de la somme des carrés
+    offset = np.nan_to_num(np.nanmean(x, axis=0)) if x.size else 0.0
+    s1, s2 = _rolling_sums(x - offset, window)
+    mean = s1 / window
+    var = np.maximum((s2 - s1 * mean) / (window - 1), 0.0)
+    return mean + offset, np.sqrt(var)
+
+
+def _rsi(x: np.ndarray, period: int) -> np.ndarray:
+    delta = np.full(x.shape, np.nan)
+    delta[1:] = x[1:] - x[:-1]
+    gain = _rolling_mean(np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None)), period)
+    loss = _rolling_mean(np.where(np.isnan(delta), np.nan, np.clip(-delta, 0, None)), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + gain / loss)
+
+
+# --- API DataFrame ---
+
+def _wrap(values: np.ndarray, like: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame(values, index=like.index, columns=like.columns)
+
+
+def ema(matrix: pd.DataFrame, span: int) -> pd.DataFrame:
+    return _wrap(_ema(matrix.to_numpy(dtype=float), span), matrix)
+
+
+def rsi(matrix: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    return _wrap(_rsi(matrix.to_numpy(dtype=float), period), matrix)
+
+
+def macd(matrix: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9):
+    x = matrix.to_numpy(dtype=float)
+    line = _ema(x, fast) - _ema(x, slow)
+    return _wrap(line, matrix), _wrap(_ema(line, signal), matrix)
+
+
+def bollinger(matrix: pd.DataFrame, window: int = 20, k: float = 2.0):
+    """(SMA, bande supérieure, bande inférieure, écart-type)."""
+    sma, std = _rolling_mean_std(matrix.to_numpy(dtype=float), window)
+    return _wrap(sma, matrix), _wrap(sma + k * std, matrix), _wrap(sma - k * std, matrix), _wrap(std, matrix)
+
+
+@section("indicators")
+def compute_indicators(matrix: pd.DataFrame, rsi_period: int = 14, bb_window: int = 20) -> pd.DataFrame:
+    """Tous les indicateurs pour toutes les cryptos : colonnes MultiIndex (indicateur, crypto)."""
+    x = matrix.to_numpy(dtype=float)
+    ema12, ema26 = _ema(x, 12), _ema(x, 26)
+    macd_line = ema12 - ema26
+    sma, std = _rolling_mean_std(x, bb_window)
+    blocks = {
+        "price": x,
+        "EMA9": _ema(x, 9),
+        "EMA26": ema26,
+        "RSI": _rsi(x, rsi_period),
+        "MACD": macd_line,
+        "Signal": _ema(macd_line, 9),
+        "SMA": sma,
+        "Upper": sma + 2 * std,
+        "Lower": sma - 2 * std,
+        "Vol": std,
+    }
+    columns = pd.MultiIndex.from_product([INDICATORS, matrix.columns], names=["indicator", "coin"])
+    return pd.DataFrame(np.hstack([blocks[name] for name in INDICATORS]), index=matrix.index, columns=columns)
+
+
+def coin_frame(indicators: pd.DataFrame, coin_id: str) -> pd.DataFrame:
+    """Indicateurs d'une seule crypto : colonne `date` puis une colonne par indicateur."""
+    frame = indicators.xs(coin_id, axis=1, level="coin").dropna(subset=["price"])
+    frame.columns.name = None
+    return frame.rename_axis("date").reset_index()
+
+
+def latest_values(indicators: pd.DataFrame) -> pd.DataFrame:
+    """Dernière valeur connue de chaque indicateur : une ligne par crypto."""
+    last = indicators.ffill().iloc[-1].unstack("indicator")
+    last.columns.name = None
+    return last[INDICATORS]
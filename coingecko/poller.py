@@ -0,0 +1,80 @@
+"""
+Interrogation périodique en tâche de fond, partagée par toutes les sessions.
+
+Un seul thread appelle la source de données ; les pages lisent le dernier
+résultat publié au lieu de faire chacune leur propre boucle `while True`.
+Avec `idle_after`, le thread se met en sommeil quand plus personne ne lit le
+résultat, et reprend à la lecture suivante.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+class BackgroundPoller:
+    """Appelle `fetch()` toutes les `interval` secondes dans un thread démon et garde le dernier résultat."""
+
+    def __init__(
+        self, fetch: Callable[[], Any], interval: float, name: str = "poller", idle_after: Optional[float] = None
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        # Sans lecture (`latest()`) depuis `idle_after` s, plus d'appel à `fetch` jusqu'à la prochaine
+        self.idle_after = idle_after
+        self._value: Any = None
+        self._updated_at: Optional[float] = None
+        self._read_at = time.time()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if self._idle():
+                # Personne ne regarde : sommeil jusqu'à `latest()` ou `stop()`
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            try:
+                value = self.fetch()
+            except Exception:
+                value = None  # on garde la dernière valeur publiée
+            if value is not None:
+                with self._lock:
+                    self._value, self._updated_at = value, time.time()
+            self._ready.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return self.idle_after is not None and time.time() - self._read_at > self.idle_after
+
+    def latest(self, wait: Optional[float] = None) -> Tuple[Any, Optional[float]]:
+        """(dernière valeur, instant de publication) ; attend au plus `wait` s le premier résultat.
+
+        Chaque appel compte comme une lecture : il réveille un poller en sommeil, et `wait`
+        attend alors le résultat frais plutôt que la valeur d'avant le sommeil.
+        """
+        resumed = self._idle()
+        with self._lock:
+            self._read_at = time.time()
+        if resumed:
+            self._ready.clear()
+            self._wake.set()
+        if wait:
+            self._ready.wait(wait)
+        with self._lock:
+            return self._value, self._updated_at
+
+    def refresh(self) -> None:
+        """Déclenche une interrogation immédiate."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
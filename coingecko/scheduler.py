@@ -0,0 +1,100 @@
+"""
+Ordonnanceur des appels CoinGecko : seau à jetons commun à tout le processus,
+file de priorité et pause globale après un HTTP 429.
+"""
+
+import email.utils
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# Plus la valeur est petite, plus la requête passe tôt
+INTERACTIVE = 0
+BACKGROUND = 10
+
+# Offre publique CoinGecko : ~30 appels / minute (à relever contre un serveur local)
+DEFAULT_RATE_PER_MINUTE = float(os.environ.get("COINGECKO_RATE_PER_MINUTE", 30))
+DEFAULT_BURST = 10
+
+
+class RequestScheduler:
+    """Seau à jetons partagé ; les demandes sont servies par priorité puis par ordre d'arrivée."""
+
+    def __init__(self, rate_per_minute: float = DEFAULT_RATE_PER_MINUTE, burst: int = DEFAULT_BURST):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> None:
+        """Bloque jusqu'à obtenir un jeton. Lève `TimeoutError` si `timeout` est dépassé."""
+        ticket = (priority, next(self._seq))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiting[0] == ticket and now >= self._paused_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        heapq.heappop(self._waiting)
+                        self._cond.notify_all()
+                        return
+                    if now < self._paused_until:
+                        wait = self._paused_until - now
+                    elif self._waiting[0] == ticket:
+                        wait = (1 - self._tokens) / self.rate
+                    else:
+                        wait = None  # on attend que la requête prioritaire soit servie
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise TimeoutError("file d'attente CoinGecko saturée")
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """Suspend toutes les requêtes (après un 429) et vide le seau."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
+            self._cond.notify_all()
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Attente exponentielle avec gigue complète (« full jitter »)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Valeur de l'en-tête `Retry-After` en secondes (nombre ou date HTTP)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -0,0 +1,47 @@
+"""
+Regroupement des appels concurrents identiques (« single-flight »).
+
+Quand plusieurs sessions demandent la même donnée au même moment (cache froid
+ou tout juste expiré), un seul appel part ; les autres attendent son résultat
+au lieu d'envoyer chacun la même requête et de consommer le quota.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+from shared.instrumentation import record_cache
+
+
+class SingleFlight:
+    """Un appel en cours au plus par clé ; le résultat (ou l'exception) est partagé avec les appels concurrents.
+
+    Le résultat est le même objet pour tous : il ne doit pas être modifié par les appelants.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        # « hit » = appel évité, servi par la requête déjà en cours
+        record_cache(self.name, hit=not leader)
+        if not leader:
+            return call.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,106 @@
+"""
+Stockage local (SQLite) des historiques de prix, un point par heure.
+
+Les séries survivent aux redémarrages ; seule la partie manquante est
+redemandée à CoinGecko (voir `history.price_history`).
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "COINGECKO_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "prices.sqlite"),
+)
+
+HOUR_MS = 3_600_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    coin_id TEXT NOT NULL,
+    vs_currency TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    price REAL NOT NULL,
+    PRIMARY KEY (coin_id, vs_currency, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    coin_id TEXT NOT NULL,
+    vs_currency TEXT NOT NULL,
+    covered_from INTEGER NOT NULL,
+    PRIMARY KEY (coin_id, vs_currency)
+);
+"""
+
+
+class PriceStore:
+    """Séries horaires par (crypto, devise) : `ts` = début de l'heure en ms, `price` = dernier prix vu."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def coverage(self, coin_id: str, vs_currency: str) -> Optional[Tuple[int, int]]:
+        """(début couvert, dernière heure stockée) en ms, ou None si la série est vide."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.covered_from, MAX(p.ts) FROM coverage c JOIN prices p"
+                " ON p.coin_id = c.coin_id AND p.vs_currency = c.vs_currency"
+                " WHERE c.coin_id = ? AND c.vs_currency = ?",
+                (coin_id, vs_currency),
+            ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        return row[0], row[1]
+
+    def append(
+        self,
+        coin_id: str,
+        vs_currency: str,
+        points: Iterable[Sequence[float]],
+        covered_from: Optional[int] = None,
+    ) -> int:
+        """Ajoute des points `[ts_ms, prix]` ; le dernier prix de chaque heure l'emporte."""
+        hourly = {}
+        for ts, price in points:
+            if price is not None:
+                hourly[int(ts) - int(ts) % HOUR_MS] = float(price)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prices (coin_id, vs_currency, ts, price) VALUES (?, ?, ?, ?)",
+                [(coin_id, vs_currency, ts, price) for ts, price in hourly.items()],
+            )
+            if covered_from is not None:
+                self._conn.execute(
+                    "INSERT INTO coverage (coin_id, vs_currency, covered_from) VALUES (?, ?, ?)"
+                    " ON CONFLICT (coin_id, vs_currency)"
+                    " DO UPDATE SET covered_from = MIN(covered_from, excluded.covered_from)",
+                    (coin_id, vs_currency, int(covered_from)),
+                )
+        return len(hourly)
+
+    def load(self, coin_id: str, vs_currency: str, since_ms: int = 0) -> List[Tuple[int, float]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT ts, price FROM prices WHERE coin_id = ? AND vs_currency = ? AND ts >= ? ORDER BY ts",
+                (coin_id, vs_currency, int(since_ms)),
+            ).fetchall()
+
+
+_store: Optional[PriceStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> PriceStore:
+    """Store partagé par tout le processus."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore()
+        return _store
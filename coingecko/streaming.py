@@ -0,0 +1,199 @@
+"""
+Indicateurs incrémentaux : chaque nouveau prix est intégré en temps et mémoire
+constants, sans recalculer tout l'historique.
+
+Chaque indicateur expose `update(x)` (intègre définitivement le prix) et
+`peek(x)` (valeur qu'on obtiendrait avec ce prix, sans modifier l'état), ce qui
+permet d'afficher une bougie en cours qui n'est pas encore clôturée.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+from .store import HOUR_MS
+
+NAN = float("nan")
+
+
+class StreamingEMA:
+    """EMA équivalente à `ewm(span, adjust=False)`."""
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value: Optional[float] = None
+
+    def peek(self, x: float) -> float:
+        return x if self.value is None else self.value + self.alpha * (x - self.value)
+
+    def update(self, x: float) -> float:
+        self.value = self.peek(x)
+        return self.value
+
+
+class StreamingRSI:
+    """RSI de Wilder : moyenne simple des `period` premières variations, puis lissage 1/period."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[float] = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    def _advance(self, x: float) -> Tuple[int, float, float]:
+        if self.prev is None:
+            return 0, 0.0, 0.0
+        delta = x - self.prev
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        count = self.count + 1
+        if count <= self.period:
+            # Phase d'amorçage : moyenne arithmétique
+            return count, self.avg_gain + (gain - self.avg_gain) / count, self.avg_loss + (loss - self.avg_loss) / count
+        p = self.period
+        return count, (self.avg_gain * (p - 1) + gain) / p, (self.avg_loss * (p - 1) + loss) / p
+
+    def _value(self, count: int, avg_gain: float, avg_loss: float) -> float:
+        if count < self.period:
+            return NAN
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+    def peek(self, x: float) -> float:
+        return self._value(*self._advance(x))
+
+    def update(self, x: float) -> float:
+        self.count, self.avg_gain, self.avg_loss = self._advance(x)
+        self.prev = x
+        return self._value(self.count, self.avg_gain, self.avg_loss)
+
+
+class StreamingMACD:
+    """MACD (EMA rapide − EMA lente) et sa ligne de signal."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def peek(self, x: float) -> Tuple[float, float]:
+        line = self.fast.peek(x) - self.slow.peek(x)
+        return line, self.signal.peek(line)
+
+    def update(self, x: float) -> Tuple[float, float]:
+        line = self.fast.update(x) - self.slow.update(x)
+        return line, self.signal.update(line)
+
+
+class RollingStats:
+    """Moyenne et écart-type (ddof=1) sur une fenêtre glissante, par l'algorithme de Welford."""
+
+    def __init__(self, window: int = 20):
+        self.window = window
+        self.values: deque = deque()
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    @staticmethod
+    def _add(n: int, mean: float, m2: float, x: float) -> Tuple[int, float, float]:
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        return n, mean, m2 + delta * (x - mean)
+
+    @staticmethod
+    def _remove(n: int, mean: float, m2: float, x: float) -> Tuple[int, float, float]:
+        if n <= 1:
+            return 0, 0.0, 0.0
+        n -= 1
+        delta = x - mean
+        mean -= delta / n
+        return n, mean, max(m2 - delta * (x - mean), 0.0)
+
+    def _advance(self, x: float) -> Tuple[int, float, float]:
+        state = self._add(self.n, self.mean, self.m2, x)
+        if self.n == self.window:
+            state = self._remove(*state, self.values[0])
+        return state
+
+    def _value(self, n: int, mean: float, m2: float) -> Tuple[float, float]:
+        if n < self.window:
+            return NAN, NAN
+        return mean, math.sqrt(m2 / (n - 1))
+
+    def peek(self, x: float) -> Tuple[float, float]:
+        return self._value(*self._advance(x))
+
+    def update(self, x: float) -> Tuple[float, float]:
+        self.n, self.mean, self.m2 = self._advance(x)
+        self.values.append(x)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        return self._value(self.n, self.mean, self.m2)
+
+
+class LiveIndicators:
+    """Indicateurs d'une crypto alimentés tick par tick.
+
+    Les ticks d'une même bougie (`bar_ms`) remplacent le prix en cours ; la
+    bougie n'est intégrée à l'état qu'à l'ouverture de la suivante.
+    """
+
+    def __init__(self, bar_ms: int = HOUR_MS, rsi_period: int = 14, bb_window: int = 20):
+        self.bar_ms = bar_ms
+        self.ema9 = StreamingEMA(9)
+        self.ema26 = StreamingEMA(26)
+        self.rsi = StreamingRSI(rsi_period)
+        self.macd = StreamingMACD()
+        self.bollinger = RollingStats(bb_window)
+        self.bar: Optional[int] = None
+        self.pending: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _commit(self, x: float) -> None:
+        self.ema9.update(x)
+        self.ema26.update(x)
+        self.rsi.update(x)
+        self.macd.update(x)
+        self.bollinger.update(x)
+
+    def seed(self, points: Iterable[Tuple[float, float]]) -> None:
+        """Intègre un historique `(timestamp ms, prix)` trié."""
+        for ts, price in points:
+            self.tick(ts, price)
+
+    def tick(self, ts: float, price: float) -> Dict[str, float]:
+        with self._lock:
+            bar = int(ts) // self.bar_ms
+            if self.bar is not None and bar < self.bar:
+                return self._snapshot()  # tick en retard : ignoré
+            if self.bar is not None and bar > self.bar:
+                self._commit(self.pending)
+            self.bar, self.pending = bar, float(price)
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict[str, float]:
+        x = self.pending
+        if x is None:
+            return {}
+        macd, signal = self.macd.peek(x)
+        sma, std = self.bollinger.peek(x)
+        return {
+            "price": x,
+            "EMA9": self.ema9.peek(x),
+            "EMA26": self.ema26.peek(x),
+            "RSI": self.rsi.peek(x),
+            "MACD": macd,
+            "Signal": signal,
+            "SMA": sma,
+            "Upper": sma + 2 * std,
+            "Lower": sma - 2 * std,
+            "Vol": std,
+        }
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return self._snapshot()
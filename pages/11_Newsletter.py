@@ -1,9 +1,14 @@
 import streamlit as st
 import feedparser
-import requests
+import hashlib
+import json
+import threading
+from collections import OrderedDict
 from openai import OpenAI
 from datetime import datetime
 
+from shared.cache import swr_cache
+
 # === PAGE CONFIG ===
 st.set_page_config(page_title="📰 Résumé Grok Crypto", page_icon="🤖", layout="centered")
 
@@ -17,6 +22,12 @@ with st.sidebar:
     if api_key:
         st.success("Clé chargée !")
 
+# === RÉGLAGES ===
+MODEL = "grok-4"
+SYSTEM_PROMPT = "Tu es Grok, l'IA la plus intelligente du monde. Résume en français, clair, avec des bullet points, les points clés, les tendances, et ce qu'il faut retenir pour un trader crypto. Sois direct et fun."
+MAX_ARTICLES = 20
+MAX_DIGESTS = 100  # résumés gardés en mémoire (les moins récemment servis évincés)
+
 # === CHOIX DU THÈME ===
 theme = st.selectbox("Choisis ton thème :", 
                      ["Bitcoin & Cryptomonnaies", "IA & Tech", "France", "Monde", "Personnalisé"])
@@ -31,29 +42,83 @@ themes = {
 
 query = themes[theme]
 
+# === NEWS ET RÉSUMÉS EN CACHE ===
+@swr_cache(soft_ttl=300, hard_ttl=3600)
+def fetch_articles(query):
+    """20 dernières news Google News (flux gardé 5 min, rafraîchi en fond ensuite)."""
+    # RSS Google News France
+    rss_url = f"https://news.google.com/rss/search?q={query}&hl=fr&gl=FR&ceid=FR:fr"
+    feed = feedparser.parse(rss_url)
+    articles = tuple({
+        "title": entry.title,
+        "link": entry.link,
+        "published": entry.published,
+        "summary": entry.summary[:500] if 'summary' in entry else ""
+    } for entry in feed.entries[:MAX_ARTICLES])
+    if not articles:
+        # Pas mis en cache : le prochain clic réessaie
+        raise ValueError(f"flux vide ({feed.get('bozo_exception', 'aucune entrée')})")
+    return articles
+
+@st.cache_resource
+def digest_cache():
+    """Résumés terminés, par empreinte (thème + articles) : partagés entre sessions, d'où le verrou."""
+    return OrderedDict(), threading.Lock()
+
+def digest_key(theme, query, articles):
+    """Empreinte sha256 du jeu d'articles, du thème et du modèle : mêmes news → même résumé."""
+    payload = json.dumps({"theme": theme, "query": query, "model": MODEL, "articles": articles},
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def stream_summary(client, news_text):
+    """Morceaux de texte au fil de la génération, pour `st.write_stream`."""
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Résume ces 20 dernières news crypto en un résumé puissant :\n\n{news_text}"}
+        ],
+        temperature=0.7,
+        max_tokens=1500,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 # === BOUTON MAGIQUE ===
 if st.button("🚀 Lancer le résumé Grok", type="primary"):
     if not api_key:
         st.error("Met ta clé API dans la sidebar !")
     else:
         with st.spinner("Je récupère les news sur Google..."):
-            # RSS Google News France
-            rss_url = f"https://news.google.com/rss/search?q={query}&hl=fr&gl=FR&ceid=FR:fr"
-            feed = feedparser.parse(rss_url)
-            
-            articles = []
-            for entry in feed.entries[:20]:
-                articles.append({
-                    "title": entry.title,
-                    "link": entry.link,
-                    "published": entry.published,
-                    "summary": entry.summary[:500] if 'summary' in entry else ""
-                })
+            try:
+                articles = fetch_articles(query)
+            except Exception as e:
+                articles = ()
+                st.warning(f"Flux Google News indisponible : {e}")
+            failure = fetch_articles.refresh_failure(query)
+            if failure:
+                error, computed_at = failure
+                st.warning(f"Flux Google News non rafraîchi : {error}. News de {datetime.fromtimestamp(computed_at):%H:%M} affichées.")
         
         if not articles:
             st.error("Aucune news trouvée 😅 Réessaie avec un autre thème")
         else:
-            with st.spinner("Grok 4 analyse tout ça (5 secondes)..."):
+            digests, digests_lock = digest_cache()
+            key = digest_key(theme, query, articles)
+            with digests_lock:
+                cached = digests.get(key)
+                if cached is not None:
+                    digests.move_to_end(key)
+            if cached is not None:
+                # Mêmes news, même thème : résumé déjà produit, aucun appel au modèle
+                resume, generated_at = cached
+                st.success("Résumé Grok prêt ! 🎉 (déjà calculé pour ces news)")
+                st.markdown(f"### 🤖 **Résumé par Grok 4** - {generated_at.strftime('%d/%m %H:%M')}")
+                st.markdown(resume)
+            else:
                 # Prépare le texte pour Grok
                 news_text = "\n\n".join([
                     f"{i+1}. {a['title']}\nLien: {a['link']}\nDate: {a['published']}\nRésumé: {a['summary']}"
@@ -65,22 +130,21 @@ if st.button("🚀 Lancer le résumé Grok", type="primary"):
                     base_url="https://api.x.ai/v1"
                 )
                 
-                response = client.chat.completions.create(
-                    model="grok-4",
-                    messages=[
-                        {"role": "system", "content": "Tu es Grok, l'IA la plus intelligente du monde. Résume en français, clair, avec des bullet points, les points clés, les tendances, et ce qu'il faut retenir pour un trader crypto. Sois direct et fun."},
-                        {"role": "user", "content": f"Résume ces 20 dernières news crypto en un résumé puissant :\n\n{news_text}"}
-                    ],
-                    temperature=0.7,
-                    max_tokens=1500
-                )
-                
-                resume = response.choices[0].message.content
-                
-                st.success("Résumé Grok prêt ! 🎉")
-                st.markdown(f"### 🤖 **Résumé par Grok 4** - {datetime.now().strftime('%d/%m %H:%H')}")
-                st.markdown(resume)
-                
-                with st.expander("Voir les 20 sources brutes"):
-                    for a in articles:
-                        st.markdown(f"- **{a['title']}**  \n  [{a['published']}]({a['link']})")
\ No newline at end of file
+                generated_at = datetime.now()
+                st.markdown(f"### 🤖 **Résumé par Grok 4** - {generated_at.strftime('%d/%m %H:%M')}")
+                # Affiché token par token ; mis en cache seulement une fois complet
+                try:
+                    resume = st.write_stream(stream_summary(client, news_text))
+                except Exception as e:
+                    resume = None
+                    st.error(f"Grok indisponible : {e}")
+                if resume:
+                    with digests_lock:
+                        digests[key] = (resume, generated_at)
+                        while len(digests) > MAX_DIGESTS:
+                            digests.popitem(last=False)
+                    st.success("Résumé Grok prêt ! 🎉")
+            
+            with st.expander("Voir les 20 sources brutes"):
+                for a in articles:
+                    st.markdown(f"- **{a['title']}**  \n  [{a['published']}]({a['link']})")
\ No newline at end of file
@@ -0,0 +1,88 @@
+import time
+
+import streamlit as st
+
+from coingecko import get_collector
+from shared import instrumentation
+
+# --------------------------------------------------
+# 🎯 CONFIG
+# --------------------------------------------------
+st.set_page_config(page_title="Diagnostics", page_icon="🩺", layout="wide")
+st.title("🩺 Diagnostics — performances des pages")
+st.caption("Mesures du processus Streamlit courant : temps par section, octets reçus, caches.")
+
+if st.button("🔄 Remettre les compteurs à zéro"):
+    instrumentation.reset()
+
+reruns = instrumentation.recent_reruns()
+sections = instrumentation.section_stats()
+caches = instrumentation.cache_stats()
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Reruns mesurés", len(reruns))
+col2.metric("Reçu du réseau", f"{instrumentation.bytes_received() / 1e6:,.2f} Mo")
+hits, misses = caches["hits"].sum(), caches["misses"].sum()
+col3.metric("Taux de succès des caches", f"{hits / (hits + misses):.0%}" if hits + misses else "—")
+
+# --------------------------------------------------
+# ⏱️ DERNIERS RERUNS
+# --------------------------------------------------
+st.subheader("⏱️ Derniers reruns")
+if reruns.empty:
+    st.info("Aucun rerun mesuré : ouvrez une page du tableau de bord puis revenez ici.")
+else:
+    pages = sorted(reruns["page"].unique())
+    selected = st.multiselect("Pages :", pages, default=pages)
+    shown = reruns[reruns["page"].isin(selected)]
+    st.dataframe(
+        shown,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"début": st.column_config.DatetimeColumn(format="HH:mm:ss")},
+    )
+
+    by_page = shown.groupby("page")["durée (ms)"].describe(percentiles=[0.5, 0.95])[["count", "50%", "95%", "max"]]
+    st.markdown("**Durée par page (ms)**")
+    st.dataframe(by_page.rename(columns={"count": "reruns", "50%": "p50", "95%": "p95"}), use_container_width=True)
+
+# --------------------------------------------------
+# 🐢 SECTIONS LES PLUS LENTES
+# --------------------------------------------------
+st.subheader("🐢 Sections les plus lentes")
+if sections.empty:
+    st.info("Aucune section mesurée.")
+else:
+    st.bar_chart(sections.set_index("section")["total (ms)"])
+    st.dataframe(sections, use_container_width=True, hide_index=True)
+    st.caption("Totaux du processus, y compris le collecteur en arrière-plan ; « quota » = attente du limiteur de débit.")
+
+# --------------------------------------------------
+# 🗄️ CACHES
+# --------------------------------------------------
+st.subheader("🗄️ Efficacité des caches")
+if caches.empty:
+    st.info("Aucun accès au cache mesuré.")
+else:
+    st.dataframe(
+        caches,
+        use_container_width=True,
+        hide_index=True,
+        column_config={"taux de succès": st.column_config.ProgressColumn(min_value=0, max_value=1, format="percent")},
+    )
+
+# --------------------------------------------------
+# 📡 COLLECTEUR COINGECKO
+# --------------------------------------------------
+st.subheader("📡 Collecteur CoinGecko")
+collector = get_collector()
+st.metric("Âge des données publiées", f"{time.time() - collector.snapshot().published_at:,.0f} s")
+failure = collector.last_failure
+if failure is not None:
+    error, failed_at = failure
+    st.warning(
+        f"Dernière collecte en échec ({time.strftime('%H:%M:%S', time.localtime(failed_at))}) : "
+        f"{error}. Les pages servent les dernières données publiées."
+    )
+else:
+    st.success("Dernière collecte sans erreur.")
@@ -7,42 +7,105 @@ st.write("Voici la page d'analyse.")
 
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import datetime
 
+from coingecko import CoinGeckoError, get_collector
+from shared.instrumentation import end_rerun, section, start_rerun
+
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="📊 Crypto Tracker - CoinGecko", layout="wide")
+start_rerun(__file__)
 
 st.title("📈 Suivi des Cryptomonnaies (API CoinGecko)")
 st.write("Données en temps réel depuis [CoinGecko](https://www.coingecko.com).")
 
 # --- CHARGEMENT DES DONNÉES DEPUIS COINGECKO ---
-@st.cache_data(ttl=300)
 def get_crypto_data(vs_currency="usd", per_page=20):
-    """Récupère les prix des cryptos via l'API CoinGecko"""
-    url = (
-        f"https://api.coingecko.com/api/v3/coins/markets"
-        f"?vs_currency={vs_currency}&order=market_cap_desc&per_page={per_page}&page=1&sparkline=false"
-    )
-    response = requests.get(url)
-    if response.status_code == 200:
-        return pd.DataFrame(response.json())
-    else:
+    """Récupère les prix des cryptos via le collecteur CoinGecko partagé"""
+    try:
+        return get_collector().top_markets(vs_currency, per_page, sparkline=True)
+    except CoinGeckoError:
         st.error("Erreur lors de la récupération des données.")
         return pd.DataFrame()
 
+# Tendance 7 jours : sparklines float32 livrées par /coins/markets, sans appel supplémentaire
+TREND_CONFIG = {"Tendance 7 j": st.column_config.LineChartColumn("Tendance 7 j", width="medium")}
+
+# --- UNIVERS COMPLET : tri, filtre et pagination côté serveur ---
+UNIVERSE_SIZES = [250, 500, 1000, 2000]
+SORT_COLUMNS = {
+    "Rang": "market_cap_rank",
+    "Nom": "name",
+    "Prix": "current_price",
+    "Capitalisation": "market_cap",
+    "Volume 24h": "total_volume",
+    "% Variation 24h": "price_change_percentage_24h",
+}
+
+def browse_universe(data, query, sort_by, descending):
+    """Filtre (nom ou symbole) puis tri de la table complète ; seule la page demandée part au navigateur."""
+    if query:
+        mask = data["name"].str.contains(query, case=False, regex=False, na=False) | data["symbol"].str.contains(query, case=False, regex=False, na=False)
+        data = data[mask]
+    return data.sort_values(SORT_COLUMNS[sort_by], ascending=not descending, na_position="last", kind="stable")
+
+def show_universe(currency):
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+    with col1:
+        size = st.selectbox("🌍 Univers :", UNIVERSE_SIZES, index=2, format_func=lambda n: f"Top {n}")
+    with col2:
+        query = st.text_input("🔎 Filtrer (nom ou symbole) :")
+    with col3:
+        sort_by = st.selectbox("↕️ Trier par :", list(SORT_COLUMNS))
+    with col4:
+        page_size = st.selectbox("📄 Lignes par page :", [50, 100, 250])
+    descending = st.toggle("Ordre décroissant", value=sort_by != "Rang" and sort_by != "Nom")
+
+    data = get_crypto_data(vs_currency=currency, per_page=size)
+    if data.empty:
+        st.warning("Aucune donnée à afficher.")
+        return
+    rows = browse_universe(data, query, sort_by, descending)
+    pages = max(1, -(-len(rows) // page_size))
+    page = st.number_input(f"Page (sur {pages}) :", min_value=1, max_value=pages, value=1)
+    shown = rows.iloc[(page - 1) * page_size:page * page_size]
+    st.caption(f"{len(rows)} cryptos sur {len(data)} — lignes {(page - 1) * page_size + 1} à {(page - 1) * page_size + len(shown)}")
+    with section("dataframe"):
+        st.dataframe(
+            shown[["market_cap_rank", "name", "symbol", "current_price", "market_cap", "total_volume", "price_change_percentage_24h", "sparkline_in_7d"]].rename(
+                columns={
+                    "market_cap_rank": "Rang",
+                    "name": "Nom",
+                    "symbol": "Symbole",
+                    "current_price": f"Prix ({currency.upper()})",
+                    "market_cap": "Capitalisation",
+                    "total_volume": "Volume 24h",
+                    "price_change_percentage_24h": "% Variation 24h",
+                    "sparkline_in_7d": "Tendance 7 j",
+                }
+            ),
+            use_container_width=True,
+            hide_index=True,
+            column_config=TREND_CONFIG,
+        )
+
 # --- INTERFACE UTILISATEUR ---
 col1, col2 = st.columns(2)
 with col1:
     currency = st.selectbox("💵 Devise :", ["usd", "eur", "btc"])
 with col2:
-    limit = st.slider("📊 Nombre de cryptos affichées :", 5, 50, 20)
+    universe = st.toggle("🌍 Univers complet (top 250 à 2000)")
+    if not universe:
+        limit = st.slider("📊 Nombre de cryptos affichées :", 5, 50, 20)
 
 # --- AFFICHAGE DES DONNÉES ---
-data = get_crypto_data(vs_currency=currency, per_page=limit)
+data = pd.DataFrame() if universe else get_crypto_data(vs_currency=currency, per_page=limit)
 
-if not data.empty:
-    data_display = data[["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h"]]
+if universe:
+    show_universe(currency)
+
+elif not data.empty:
+    data_display = data[["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h", "sparkline_in_7d"]]
     data_display = data_display.rename(
         columns={
             "name": "Nom",
@@ -50,9 +113,11 @@ if not data.empty:
             "current_price": f"Prix ({currency.upper()})",
             "market_cap": "Capitalisation",
             "price_change_percentage_24h": "% Variation 24h",
+            "sparkline_in_7d": "Tendance 7 j",
         }
     )
-    st.dataframe(data_display, use_container_width=True)
+    with section("dataframe"):
+        st.dataframe(data_display, use_container_width=True, column_config=TREND_CONFIG)
 
     st.markdown("---")
     st.subheader("📊 Top 10 par capitalisation")
@@ -62,3 +127,5 @@ if not data.empty:
 
 else:
     st.warning("Aucune donnée à afficher.")
+
+end_rerun()
@@ -6,76 +6,83 @@ st.write("Page de configuration ou de préférences.")
 
 import streamlit as st
 import pandas as pd
-import requests
 import numpy as np
 from datetime import datetime
 
+from coingecko import BACKGROUND, DEFAULT_MAX_WORKERS, CoinGeckoError, fetch_concurrently, get_collector
+from coingecko.indicators import compute_indicators, latest_values, price_matrix, sparkline_matrix
+from shared.instrumentation import end_rerun, section, start_rerun
+
 # --- CONFIGURATION DE LA PAGE ---
 st.set_page_config(page_title="📊 CoinGecko + RSI", layout="wide")
+start_rerun(__file__)
 st.title("📈 Suivi des Cryptos avec RSI (API CoinGecko)")
 st.write("Ce tableau affiche les prix en temps réel et le RSI calculé sur 14 jours.")
 
 # --- 1️⃣ FONCTIONS UTILITAIRES ---
-@st.cache_data(ttl=300)
-def get_market_data(vs_currency="usd", per_page=10):
-    url = (
-        f"https://api.coingecko.com/api/v3/coins/markets"
-        f"?vs_currency={vs_currency}&order=market_cap_desc&per_page={per_page}&page=1&sparkline=false"
-    )
-    res = requests.get(url)
-    if res.status_code == 200:
-        return pd.DataFrame(res.json())
-    else:
+def get_market_data(vs_currency="usd", per_page=10, sparkline=False):
+    try:
+        return get_collector().top_markets(vs_currency, per_page, sparkline=sparkline)
+    except CoinGeckoError:
         st.error("Erreur lors de la récupération des données.")
         return pd.DataFrame()
 
-@st.cache_data(ttl=300)
 def get_historical_prices(coin_id, vs_currency="usd", days=14):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={vs_currency}&days={days}"
-    res = requests.get(url)
-    if res.status_code == 200:
-        prices = pd.DataFrame(res.json()["prices"], columns=["timestamp", "price"])
-        prices["timestamp"] = pd.to_datetime(prices["timestamp"], unit="ms")
-        return prices
-    else:
+    try:
+        # Chargement en masse : passe après les requêtes interactives des autres pages
+        return get_collector().history(coin_id, vs_currency, days, priority=BACKGROUND)
+    except CoinGeckoError:
         return pd.DataFrame()
 
-def compute_rsi(prices, period=14):
-    """Calcule le RSI à partir d’une série de prix"""
-    if prices.empty or len(prices) < period:
-        return np.nan
-    delta = prices["price"].diff()
-    gain = delta.clip(lower=0).rolling(window=period).mean()
-    loss = (-delta.clip(upper=0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi.iloc[-1]  # Dernière valeur
-
 # --- 2️⃣ INTERFACE UTILISATEUR ---
+SPARKLINE_MODE = "Sparklines 7 j (1 seule requête)"
+HISTORY_MODE = "Historiques 14 j (1 requête par crypto)"
+mode = st.radio("🧮 Source des indicateurs :", [SPARKLINE_MODE, HISTORY_MODE], horizontal=True)
+
 col1, col2 = st.columns(2)
 with col1:
     currency = st.selectbox("💵 Devise :", ["usd", "eur"])
 with col2:
-    limit = st.slider("📊 Nombre de cryptos :", 5, 30, 10)
+    # En mode sparkline, le coût ne dépend pas du nombre de lignes : un seul appel /coins/markets
+    limit = st.slider("📊 Nombre de cryptos :", 5, 250 if mode == SPARKLINE_MODE else 30, 10)
+
+if mode == HISTORY_MODE:
+    max_workers = st.sidebar.slider("⚡ Requêtes simultanées", 1, 16, DEFAULT_MAX_WORKERS)
 
 # --- 3️⃣ RÉCUPÉRATION DES DONNÉES ---
-market_data = get_market_data(currency, limit)
+market_data = get_market_data(currency, limit, sparkline=mode == SPARKLINE_MODE)
 
-# --- 4️⃣ AJOUT DU RSI POUR CHAQUE CRYPTO ---
-rsi_values = []
+# --- 4️⃣ AJOUT DES INDICATEURS POUR CHAQUE CRYPTO ---
 if not market_data.empty:
-    progress = st.progress(0)
-    for i, coin in enumerate(market_data["id"]):
-        prices = get_historical_prices(coin, currency, 14)
-        rsi = compute_rsi(prices)
-        rsi_values.append(rsi)
-        progress.progress((i + 1) / len(market_data))
-    progress.empty()
-    market_data["RSI"] = rsi_values
+    if mode == SPARKLINE_MODE:
+        # Prix horaires des 7 derniers jours, déjà présents dans la réponse /coins/markets
+        matrix = sparkline_matrix(dict(zip(market_data["id"], market_data["sparkline_in_7d"])))
+    else:
+        # Historiques téléchargés en parallèle ; chacun est publié dans l'instantané partagé dès son arrivée
+        histories = {}
+        progress = st.progress(0)
+        downloads = fetch_concurrently(
+            lambda coin: get_historical_prices(coin, currency, 14),
+            market_data["id"],
+            max_workers=max_workers,
+        )
+        for i, (coin, prices) in enumerate(downloads):
+            histories[coin] = prices
+            progress.progress((i + 1) / len(market_data))
+        progress.empty()
+        matrix = price_matrix(histories)
+
+    # Indicateurs de toutes les cryptos en une passe, dernière valeur connue de chacune
+    if not matrix.empty:
+        latest = latest_values(compute_indicators(matrix))
+        for column, indicator in [("RSI", "RSI"), ("EMA 9", "EMA9"), ("EMA 26", "EMA26"), ("MACD", "MACD")]:
+            market_data[column] = market_data["id"].map(latest[indicator])
+    else:
+        market_data[["RSI", "EMA 9", "EMA 26", "MACD"]] = np.nan
 
     # --- 5️⃣ TABLEAU FINAL ---
     display_data = market_data[
-        ["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h", "RSI"]
+        ["name", "symbol", "current_price", "market_cap", "price_change_percentage_24h", "RSI", "EMA 9", "EMA 26", "MACD"]
     ].rename(
         columns={
             "name": "Nom",
@@ -97,10 +104,13 @@ if not market_data.empty:
         else:
             return ""
 
-    st.subheader("📊 Tableau du marché avec RSI (14 jours)")
-    st.dataframe(display_data.style.applymap(color_rsi, subset=["RSI"]), use_container_width=True)
+    st.subheader("📊 Tableau du marché avec RSI, EMA et MACD")
+    with section("styler"):
+        st.dataframe(display_data.style.applymap(color_rsi, subset=["RSI"]), use_container_width=True)
 
-    st.caption("⚠️ RSI > 70 = surachat | RSI < 30 = survente | Calcul basé sur les 14 derniers jours.")
+    periode = "les 7 derniers jours (sparklines)" if mode == SPARKLINE_MODE else "les 14 derniers jours"
+    st.caption(f"⚠️ RSI > 70 = surachat | RSI < 30 = survente | Calcul horaire basé sur {periode}.")
 else:
     st.warning("Aucune donnée disponible.")
 
+end_rerun()
@@ -1,13 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
 import datetime as dt
 
+from coingecko import CoinGeckoError, get_collector
+from coingecko.indicators import compute_indicators, latest_values, price_matrix
+from shared.instrumentation import end_rerun, section, start_rerun
+
 # --------------------------------------------------
 # 🎯 CONFIGURATION DE BASE
 # --------------------------------------------------
 st.set_page_config(page_title="Dashboard Crypto", layout="wide")
+start_rerun(__file__)
 
 st.title("📊 Tableau de bord Crypto complet")
 st.caption("Suivi en temps réel des cryptos principales avec indicateurs techniques")
@@ -23,83 +27,55 @@ CURRENCY = "usd"
 # --------------------------------------------------
 # ⚙️ FONCTIONS
 # --------------------------------------------------
-@st.cache_data(ttl=300)
 def get_market_data():
-    url = (
-        "https://api.coingecko.com/api/v3/coins/markets"
-        f"?vs_currency={CURRENCY}&ids={','.join(COINS.keys())}&sparkline=false"
-    )
-    r = requests.get(url)
-    data = pd.DataFrame(r.json())
+    data = get_collector().markets(CURRENCY, COINS.keys())
     data = data[["id", "name", "symbol", "current_price", "price_change_percentage_24h",
                  "market_cap", "total_volume"]]
     return data
 
-@st.cache_data(ttl=3600)
 def get_historical_prices(coin_id, days=30):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={CURRENCY}&days={days}"
-    r = requests.get(url)
-    prices = pd.DataFrame(r.json()["prices"], columns=["timestamp", "price"])
-    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
-    return prices
-
-# RSI
-def compute_rsi(prices, period=14):
-    delta = prices.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-# EMA
-def ema(series, span):
-    return series.ewm(span=span, adjust=False).mean()
-
-# MACD
-def compute_macd(prices):
-    ema12 = ema(prices, 12)
-    ema26 = ema(prices, 26)
-    macd = ema12 - ema26
-    signal = ema(macd, 9)
-    return macd, signal
-
-# Bollinger Bands
-def compute_bollinger(prices, window=20):
-    sma = prices.rolling(window).mean()
-    std = prices.rolling(window).std()
-    upper = sma + (2 * std)
-    lower = sma - (2 * std)
-    return sma, upper, lower, std
+    return get_collector().history(coin_id, CURRENCY, days)
 
 # --------------------------------------------------
 # 📈 RÉCUPÉRATION DES DONNÉES
 # --------------------------------------------------
-data = get_market_data()
+try:
+    data = get_market_data()
+except CoinGeckoError as e:
+    st.error(f"CoinGecko indisponible : {e}")
+    st.stop()
 
-resultats = []
+histories = {}
 for coin in COINS.keys():
-    prices = get_historical_prices(coin, days=30)
-    prices["RSI"] = compute_rsi(prices["price"])
-    macd, signal = compute_macd(prices["price"])
-    sma, upper, lower, std = compute_bollinger(prices["price"])
+    try:
+        histories[coin] = get_historical_prices(coin, days=30)
+    except CoinGeckoError as e:
+        st.warning(f"{COINS[coin]} : historique indisponible ({e})")
+
+# Tous les indicateurs de toutes les cryptos en une passe
+matrix = price_matrix(histories)
+if matrix.empty:
+    st.error("Aucun historique disponible.")
+    st.stop()
+latest = latest_values(compute_indicators(matrix))
 
+resultats = []
+for coin in latest.index:
+    last = latest.loc[coin]
     resultats.append({
         "Nom": COINS[coin],
         "Prix (USD)": data.loc[data["id"] == coin, "current_price"].values[0],
         "Var 24h (%)": data.loc[data["id"] == coin, "price_change_percentage_24h"].values[0],
         "Capitalisation": data.loc[data["id"] == coin, "market_cap"].values[0],
         "Volume": data.loc[data["id"] == coin, "total_volume"].values[0],
-        "RSI (14j)": prices["RSI"].iloc[-1],
-        "EMA 9": ema(prices["price"], 9).iloc[-1],
-        "EMA 26": ema(prices["price"], 26).iloc[-1],
-        "MACD": macd.iloc[-1],
-        "Signal MACD": signal.iloc[-1],
-        "Volatilité (σ)": std.iloc[-1],
-        "Bande sup.": upper.iloc[-1],
-        "Bande inf.": lower.iloc[-1],
+        "RSI (14j)": last["RSI"],
+        "EMA 9": last["EMA9"],
+        "EMA 26": last["EMA26"],
+        "MACD": last["MACD"],
+        "Signal MACD": last["Signal"],
+        "Volatilité (σ)": last["Vol"],
+        "Bande sup.": last["Upper"],
+        "Bande inf.": last["Lower"],
     })
 
 df = pd.DataFrame(resultats)
@@ -108,23 +84,24 @@ df = pd.DataFrame(resultats)
 # 💹 AFFICHAGE DU TABLEAU
 # --------------------------------------------------
 st.subheader("📊 Données techniques (USD)")
-st.dataframe(
-    df.style.format({
-        "Prix (USD)": "{:,.2f}",
-        "Var 24h (%)": "{:.2f}%",
-        "Capitalisation": "{:,.0f}",
-        "Volume": "{:,.0f}",
-        "RSI (14j)": "{:.2f}",
-        "EMA 9": "{:,.2f}",
-        "EMA 26": "{:,.2f}",
-        "MACD": "{:.2f}",
-        "Signal MACD": "{:.2f}",
-        "Volatilité (σ)": "{:.2f}",
-        "Bande sup.": "{:,.2f}",
-        "Bande inf.": "{:,.2f}",
-    }),
-    use_container_width=True,
-)
+with section("styler"):
+    st.dataframe(
+        df.style.format({
+            "Prix (USD)": "{:,.2f}",
+            "Var 24h (%)": "{:.2f}%",
+            "Capitalisation": "{:,.0f}",
+            "Volume": "{:,.0f}",
+            "RSI (14j)": "{:.2f}",
+            "EMA 9": "{:,.2f}",
+            "EMA 26": "{:,.2f}",
+            "MACD": "{:.2f}",
+            "Signal MACD": "{:.2f}",
+            "Volatilité (σ)": "{:.2f}",
+            "Bande sup.": "{:,.2f}",
+            "Bande inf.": "{:,.2f}",
+        }),
+        use_container_width=True,
+    )
 
 # --------------------------------------------------
 # 🧠 EXPLICATIONS
@@ -169,4 +146,6 @@ with st.expander("🔸 Volatilité (écart-type)"):
     - Une forte volatilité = mouvements rapides (opportunités, mais plus de risque).
     """)
 
-st.caption("💡 Données issues de CoinGecko, mises à jour automatiquement toutes les 5 minutes.")
\ No newline at end of file
+st.caption("💡 Données issues de CoinGecko, mises à jour automatiquement toutes les 5 minutes.")
+
+end_rerun()
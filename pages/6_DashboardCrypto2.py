@@ -1,13 +1,17 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import requests
-import plotly.graph_objects as go
+
+from coingecko import CoinGeckoError, get_collector
+from coingecko.charts import DEFAULT_POINTS, coin_figure
+from coingecko.indicators import coin_frame, compute_indicators, price_matrix
+from shared.export import download_buttons
+from shared.instrumentation import end_rerun, section, start_rerun
 
 # --------------------------------------------------
 # 🎯 CONFIG
 # --------------------------------------------------
 st.set_page_config(page_title="Dashboard Crypto Complet", layout="wide")
+start_rerun(__file__)
 st.title("💹 Tableau de bord Crypto — Analyse Technique")
 st.caption("Données CoinGecko • Indicateurs : RSI, EMA, MACD, Bandes de Bollinger")
 
@@ -19,55 +23,29 @@ COINS = {
 }
 CURRENCY = "usd"
 
+# Graphiques allégés (LTTB) sauf pour zoomer sur le détail horaire
+full_resolution = st.sidebar.toggle("🔍 Pleine résolution des graphiques", help="Envoie tous les points horaires au navigateur")
+chart_points = None if full_resolution else DEFAULT_POINTS
+# Une seule crypto calculée et affichée à la fois : le coût ne grandit pas avec la liste
+one_at_a_time = st.sidebar.toggle("⚡ Une crypto à la fois", value=True, help="Seule la crypto sélectionnée est calculée et tracée")
+
 # --------------------------------------------------
 # ⚙️ FONCTIONS
 # --------------------------------------------------
-@st.cache_data(ttl=300)
 def get_market_data():
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={CURRENCY}&ids={','.join(COINS.keys())}&sparkline=false"
-    r = requests.get(url)
-    data = pd.DataFrame(r.json())
-    return data
+    return get_collector().markets(CURRENCY, COINS.keys())
 
-@st.cache_data(ttl=3600)
 def get_historical_prices(coin_id, days=30):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={CURRENCY}&days={days}"
-    r = requests.get(url)
-    prices = pd.DataFrame(r.json()["prices"], columns=["timestamp", "price"])
-    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
-    return prices
-
-def ema(series, span):
-    return series.ewm(span=span, adjust=False).mean()
-
-def compute_rsi(prices, period=14):
-    delta = prices.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def compute_macd(prices):
-    ema12 = ema(prices, 12)
-    ema26 = ema(prices, 26)
-    macd = ema12 - ema26
-    signal = ema(macd, 9)
-    return macd, signal
-
-def compute_bollinger(prices, window=20):
-    sma = prices.rolling(window).mean()
-    std = prices.rolling(window).std()
-    upper = sma + (2 * std)
-    lower = sma - (2 * std)
-    return sma, upper, lower
+    return get_collector().history(coin_id, CURRENCY, days)
 
 # --------------------------------------------------
 # 📈 TABLEAU DE DONNÉES
 # --------------------------------------------------
-data = get_market_data()
+try:
+    data = get_market_data()
+except CoinGeckoError as e:
+    st.error(f"CoinGecko indisponible : {e}")
+    st.stop()
 st.subheader("📊 Données principales (en USD)")
 
 table = data[["name", "symbol", "current_price", "price_change_percentage_24h", "market_cap", "total_volume"]]
@@ -77,49 +55,51 @@ def color_percent(val):
     color = "green" if val > 0 else "red"
     return f"color: {color}"
 
-st.dataframe(
-    table.style.format({
-        "Prix (USD)": "{:,.2f}",
-        "Variation 24h (%)": "{:+.2f}",
-        "Capitalisation": "{:,.0f}",
-        "Volume": "{:,.0f}"
-    }).applymap(color_percent, subset=["Variation 24h (%)"]),
-    use_container_width=True
-)
+with section("styler"):
+    st.dataframe(
+        table.style.format({
+            "Prix (USD)": "{:,.2f}",
+            "Variation 24h (%)": "{:+.2f}",
+            "Capitalisation": "{:,.0f}",
+            "Volume": "{:,.0f}"
+        }).applymap(color_percent, subset=["Variation 24h (%)"]),
+        use_container_width=True
+    )
 
 # --------------------------------------------------
 # 📊 GRAPHIQUES DÉTAILLÉS
 # --------------------------------------------------
 st.markdown("## 📉 Visualisation technique détaillée")
-
-for coin_id, coin_name in COINS.items():
+if one_at_a_time:
+    shown = st.radio("Crypto analysée :", list(COINS), format_func=COINS.get, horizontal=True)
+    visible = {shown: COINS[shown]}
+else:
+    visible = COINS
+
+# Historiques + indicateurs des cryptos affichées en une passe
+histories = {}
+for coin_id, coin_name in visible.items():
+    try:
+        histories[coin_id] = get_historical_prices(coin_id, 30)
+    except CoinGeckoError as e:
+        st.warning(f"{coin_name} : historique indisponible ({e})")
+matrix = price_matrix(histories)
+indicators = compute_indicators(matrix)
+
+for coin_id, coin_name in visible.items():
+    if coin_id not in matrix.columns:
+        continue
     st.markdown(f"### 🪙 {coin_name}")
-    prices = get_historical_prices(coin_id, 30)
-
-    # Calculs indicateurs
-    prices["EMA9"] = ema(prices["price"], 9)
-    prices["EMA26"] = ema(prices["price"], 26)
-    prices["RSI"] = compute_rsi(prices["price"])
-    prices["MACD"], prices["Signal"] = compute_macd(prices["price"])
-    prices["SMA"], prices["Upper"], prices["Lower"] = compute_bollinger(prices["price"])
+    prices = coin_frame(indicators, coin_id)
 
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=prices["date"], y=prices["price"], mode="lines", name="Prix", line=dict(color="white")))
-        fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA9"], mode="lines", name="EMA 9", line=dict(color="orange")))
-        fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA26"], mode="lines", name="EMA 26", line=dict(color="blue")))
-        fig.add_trace(go.Scatter(x=prices["date"], y=prices["Upper"], mode="lines", name="Bande Supérieure", line=dict(color="lightgrey", dash="dot")))
-        fig.add_trace(go.Scatter(x=prices["date"], y=prices["Lower"], mode="lines", name="Bande Inférieure", line=dict(color="lightgrey", dash="dot")))
-        fig.update_layout(
-            title=f"Prix & Indicateurs techniques ({coin_name})",
-            xaxis_title="Date",
-            yaxis_title="Prix (USD)",
-            template="plotly_dark",
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = coin_figure(prices, f"Prix & Indicateurs techniques ({coin_name})", chart_points, height=800)
+        with section("plotly"):
+            st.plotly_chart(fig, use_container_width=True)
+        # Historique + indicateurs : fichier produit seulement au clic
+        download_buttons(prices, f"history-{coin_id}", f"{coin_id}_{CURRENCY}_history")
 
     with col2:
         st.metric("💰 Prix actuel (USD)", f"{prices['price'].iloc[-1]:,.2f}")
@@ -128,20 +108,6 @@ for coin_id, coin_name in COINS.items():
         st.metric("⚡ MACD", f"{prices['MACD'].iloc[-1]:.2f}")
         st.metric("📉 Signal MACD", f"{prices['Signal'].iloc[-1]:.2f}")
 
-    # Graphiques RSI et MACD
-    rsi_chart = go.Figure()
-    rsi_chart.add_trace(go.Scatter(x=prices["date"], y=prices["RSI"], mode="lines", name="RSI", line=dict(color="green")))
-    rsi_chart.add_hline(y=70, line_dash="dot", line_color="red")
-    rsi_chart.add_hline(y=30, line_dash="dot", line_color="blue")
-    rsi_chart.update_layout(title="RSI (14 jours)", template="plotly_dark", height=200)
-    st.plotly_chart(rsi_chart, use_container_width=True)
-
-    macd_chart = go.Figure()
-    macd_chart.add_trace(go.Scatter(x=prices["date"], y=prices["MACD"], name="MACD", line=dict(color="orange")))
-    macd_chart.add_trace(go.Scatter(x=prices["date"], y=prices["Signal"], name="Signal", line=dict(color="blue")))
-    macd_chart.update_layout(title="MACD & Signal", template="plotly_dark", height=200)
-    st.plotly_chart(macd_chart, use_container_width=True)
-
     st.divider()
 
 # --------------------------------------------------
@@ -179,4 +145,6 @@ with st.expander("🔸 Bandes de Bollinger"):
     - Prix proche de la bande inférieure → **survente**  
     """)
 
-st.caption("💡 Données actualisées automatiquement via l’API CoinGecko (rafraîchissement ~5 min)")
\ No newline at end of file
+st.caption("💡 Données actualisées automatiquement via l’API CoinGecko (rafraîchissement ~5 min)")
+
+end_rerun()
@@ -1,13 +1,17 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-import requests
-import plotly.graph_objects as go
+
+from coingecko import CoinGeckoError, get_collector
+from coingecko.charts import DEFAULT_POINTS, coin_figure
+from coingecko.indicators import coin_frame, compute_indicators, price_matrix
+from shared.export import download_buttons
+from shared.instrumentation import end_rerun, section, start_rerun
 
 # --------------------------------------------------
 # 🎯 CONFIGURATION
 # --------------------------------------------------
 st.set_page_config(page_title="Dashboard Crypto Complet", layout="wide")
+start_rerun(__file__)
 st.title("💹 Tableau de bord Crypto — Analyse Technique")
 st.caption("Suivi des cryptos principales (BTC, ETH, SOL, SUI) avec indicateurs visuels et graphiques")
 
@@ -19,55 +23,29 @@ COINS = {
 }
 CURRENCY = "usd"
 
+# Graphiques allégés (LTTB) sauf pour zoomer sur le détail horaire
+full_resolution = st.sidebar.toggle("🔍 Pleine résolution des graphiques", help="Envoie tous les points horaires au navigateur")
+chart_points = None if full_resolution else DEFAULT_POINTS
+# Une seule crypto calculée et affichée à la fois : le coût ne grandit pas avec la liste
+one_at_a_time = st.sidebar.toggle("⚡ Une crypto à la fois", value=True, help="Seule la crypto sélectionnée est calculée et tracée")
+
 # --------------------------------------------------
 # ⚙️ FONCTIONS
 # --------------------------------------------------
-@st.cache_data(ttl=300)
 def get_market_data():
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={CURRENCY}&ids={','.join(COINS.keys())}&sparkline=false"
-    r = requests.get(url)
-    data = pd.DataFrame(r.json())
-    return data
+    return get_collector().markets(CURRENCY, COINS.keys())
 
-@st.cache_data(ttl=3600)
 def get_historical_prices(coin_id, days=30):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={CURRENCY}&days={days}"
-    r = requests.get(url)
-    prices = pd.DataFrame(r.json()["prices"], columns=["timestamp", "price"])
-    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
-    return prices
-
-def ema(series, span):
-    return series.ewm(span=span, adjust=False).mean()
-
-def compute_rsi(prices, period=14):
-    delta = prices.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def compute_macd(prices):
-    ema12 = ema(prices, 12)
-    ema26 = ema(prices, 26)
-    macd = ema12 - ema26
-    signal = ema(macd, 9)
-    return macd, signal
-
-def compute_bollinger(prices, window=20):
-    sma = prices.rolling(window).mean()
-    std = prices.rolling(window).std()
-    upper = sma + (2 * std)
-    lower = sma - (2 * std)
-    return sma, upper, lower, std
+    return get_collector().history(coin_id, CURRENCY, days)
 
 # --------------------------------------------------
 # 📈 TABLEAU DES DONNÉES
 # --------------------------------------------------
-data = get_market_data()
+try:
+    data = get_market_data()
+except CoinGeckoError as e:
+    st.error(f"CoinGecko indisponible : {e}")
+    st.stop()
 
 # Données principales
 st.subheader("📊 Données de marché (USD)")
@@ -78,30 +56,44 @@ def color_percent(val):
     color = "green" if val > 0 else "red"
     return f"color: {color}"
 
-st.dataframe(
-    table.style.format({
-        "Prix (USD)": "{:,.2f}",
-        "Variation 24h (%)": "{:+.2f}",
-        "Capitalisation": "{:,.0f}",
-        "Volume": "{:,.0f}"
-    }).applymap(color_percent, subset=["Variation 24h (%)"]),
-    use_container_width=True
-)
+with section("styler"):
+    st.dataframe(
+        table.style.format({
+            "Prix (USD)": "{:,.2f}",
+            "Variation 24h (%)": "{:+.2f}",
+            "Capitalisation": "{:,.0f}",
+            "Volume": "{:,.0f}"
+        }).applymap(color_percent, subset=["Variation 24h (%)"]),
+        use_container_width=True
+    )
 
 st.markdown("---")
 
 # --------------------------------------------------
 # 🔍 ANALYSE PAR CRYPTO
 # --------------------------------------------------
-for coin_id, coin_name in COINS.items():
+if one_at_a_time:
+    shown = st.radio("Crypto analysée :", list(COINS), format_func=COINS.get, horizontal=True)
+    visible = {shown: COINS[shown]}
+else:
+    visible = COINS
+
+# Historiques + indicateurs des cryptos affichées en une passe
+histories = {}
+for coin_id, coin_name in visible.items():
+    try:
+        histories[coin_id] = get_historical_prices(coin_id, 30)
+    except CoinGeckoError as e:
+        st.warning(f"{coin_name} : historique indisponible ({e})")
+matrix = price_matrix(histories)
+indicators = compute_indicators(matrix)
+
+for coin_id, coin_name in visible.items():
+    if coin_id not in matrix.columns:
+        continue
     st.markdown(f"## 🪙 {coin_name}")
 
-    prices = get_historical_prices(coin_id, 30)
-    prices["EMA9"] = ema(prices["price"], 9)
-    prices["EMA26"] = ema(prices["price"], 26)
-    prices["RSI"] = compute_rsi(prices["price"])
-    prices["MACD"], prices["Signal"] = compute_macd(prices["price"])
-    prices["SMA"], prices["Upper"], prices["Lower"], prices["Vol"] = compute_bollinger(prices["price"])
+    prices = coin_frame(indicators, coin_id)
 
     current_price = prices["price"].iloc[-1]
     variation_24h = data.loc[data["id"] == coin_id, "price_change_percentage_24h"].values[0]
@@ -127,30 +119,12 @@ for coin_id, coin_name in COINS.items():
         **Volatilité :** {vol_now:.2f}
         """)
     
-    # 📊 Graphique principal : Prix + EMA + Bollinger
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["price"], mode="lines", name="Prix", line=dict(color="black")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA9"], mode="lines", name="EMA 9", line=dict(color="orange")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA26"], mode="lines", name="EMA 26", line=dict(color="cyan")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["Upper"], mode="lines", name="Bande Supérieure", line=dict(color="gray", dash="dot")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["Lower"], mode="lines", name="Bande Inférieure", line=dict(color="gray", dash="dot")))
-    fig.update_layout(title=f"Évolution du prix de {coin_name}", template="plotly_dark", height=600)
-    st.plotly_chart(fig, use_container_width=True)
-
-    # RSI Chart
-    rsi_fig = go.Figure()
-    rsi_fig.add_trace(go.Scatter(x=prices["date"], y=prices["RSI"], mode="lines", name="RSI", line=dict(color="green")))
-    rsi_fig.add_hline(y=70, line_dash="dot", line_color="red")
-    rsi_fig.add_hline(y=30, line_dash="dot", line_color="blue")
-    rsi_fig.update_layout(title="RSI (14 jours)", template="plotly_dark", height=600)
-    st.plotly_chart(rsi_fig, use_container_width=True)
-
-    # MACD Chart
-    macd_fig = go.Figure()
-    macd_fig.add_trace(go.Scatter(x=prices["date"], y=prices["MACD"], name="MACD", line=dict(color="orange")))
-    macd_fig.add_trace(go.Scatter(x=prices["date"], y=prices["Signal"], name="Signal", line=dict(color="blue")))
-    macd_fig.update_layout(title="MACD & Signal", template="plotly_dark", height=600)
-    st.plotly_chart(macd_fig, use_container_width=True)
+    # 📊 Prix + EMA + Bollinger, RSI et MACD dans une seule figure
+    fig = coin_figure(prices, f"Évolution du prix de {coin_name}", chart_points, height=900)
+    with section("plotly"):
+        st.plotly_chart(fig, use_container_width=True)
+    # Historique + indicateurs : fichier produit seulement au clic
+    download_buttons(prices, f"history-{coin_id}", f"{coin_id}_{CURRENCY}_history")
 
     st.markdown("---")
 
@@ -169,4 +143,6 @@ st.markdown("""
 - **Bandes de Bollinger** : mesurent la volatilité.  
 """)
 
-st.caption("💡 Données actualisées automatiquement via l’API CoinGecko (toutes les 5 minutes).")
\ No newline at end of file
+st.caption("💡 Données actualisées automatiquement via l’API CoinGecko (toutes les 5 minutes).")
+
+end_rerun()
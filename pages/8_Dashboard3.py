@@ -1,13 +1,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import requests
-import plotly.graph_objects as go
+
+from coingecko import CoinGeckoError, get_collector
+from coingecko.charts import DEFAULT_POINTS, coin_figure
+from coingecko.indicators import coin_frame, compute_indicators, latest_values, price_matrix
+from shared.export import download_buttons
+from shared.instrumentation import end_rerun, section, start_rerun
 
 # --------------------------------------------------
 # CONFIG
 # --------------------------------------------------
 st.set_page_config(page_title="Tableau de bord Crypto", layout="wide")
+start_rerun(__file__)
 st.title("💹 Tableau de bord Crypto — Analyse technique complète")
 st.caption("Visualisation dynamique de Bitcoin, Ethereum, Solana et Sui (RSI, EMA, MACD, tendances)")
 
@@ -19,75 +24,63 @@ COINS = {
 }
 CURRENCY = "usd"
 
+# Graphiques allégés (LTTB) sauf pour zoomer sur le détail horaire
+full_resolution = st.sidebar.toggle("🔍 Pleine résolution des graphiques", help="Envoie tous les points horaires au navigateur")
+chart_points = None if full_resolution else DEFAULT_POINTS
+# Une seule crypto calculée et affichée à la fois : le coût ne grandit pas avec la liste
+one_at_a_time = st.sidebar.toggle("⚡ Une crypto à la fois", value=True, help="Seule la crypto sélectionnée est calculée et tracée")
+
 # --------------------------------------------------
 # FONCTIONS
 # --------------------------------------------------
-@st.cache_data(ttl=300)
 def get_market_data():
-    url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={CURRENCY}&ids={','.join(COINS.keys())}&sparkline=false"
-    return pd.DataFrame(requests.get(url).json())
+    return get_collector().markets(CURRENCY, COINS.keys())
 
 
 
-@st.cache_data(ttl=3600)
 def get_historical_prices(coin_id, days=30):
-    url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={CURRENCY}&days={days}"
-    r = requests.get(url)
-    prices = pd.DataFrame(r.json()["prices"], columns=["timestamp", "price"])
-    prices["date"] = pd.to_datetime(prices["timestamp"], unit="ms")
-    return prices
-
-def ema(series, span):
-    return series.ewm(span=span, adjust=False).mean()
-
-def compute_rsi(prices, period=14):
-    delta = prices.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(period).mean()
-    avg_loss = loss.rolling(period).mean()
-    rs = avg_gain / avg_loss
-    return 100 - (100 / (1 + rs))
-
-def compute_macd(prices):
-    ema12 = ema(prices, 12)
-    ema26 = ema(prices, 26)
-    macd = ema12 - ema26
-    signal = ema(macd, 9)
-    return macd, signal
-
-def compute_bollinger(prices, window=20):
-    sma = prices.rolling(window).mean()
-    std = prices.rolling(window).std()
-    upper = sma + (2 * std)
-    lower = sma - (2 * std)
-    return sma, upper, lower, std
+    return get_collector().history(coin_id, CURRENCY, days)
 
 # --------------------------------------------------
 # TABLEAU PRINCIPAL
 # --------------------------------------------------
-data = get_market_data()
+try:
+    data = get_market_data()
+except CoinGeckoError as e:
+    st.error(f"CoinGecko indisponible : {e}")
+    st.stop()
+
+# Historiques + indicateurs de toutes les cryptos en une passe
+histories = {}
+for coin_id, coin_name in COINS.items():
+    try:
+        histories[coin_id] = get_historical_prices(coin_id, 30)
+    except CoinGeckoError as e:
+        st.warning(f"{coin_name} : historique indisponible ({e})")
+matrix = price_matrix(histories)
+if matrix.empty:
+    st.error("Aucun historique disponible.")
+    st.stop()
+indicators = compute_indicators(matrix)
 
 # Calcul RSI + Tendance
+latest = latest_values(indicators)
 tech_data = []
 for coin_id, coin_name in COINS.items():
-    prices = get_historical_prices(coin_id, 30)
-    prices["RSI"] = compute_rsi(prices["price"])
-    prices["EMA9"] = ema(prices["price"], 9)
-    prices["EMA26"] = ema(prices["price"], 26)
-    last = prices.iloc[-1]
+    if coin_id not in matrix.columns:
+        continue
+    last = latest.loc[coin_id]
     tendance = "Haussière" if last["EMA9"] > last["EMA26"] else "Baissière"
     couleur = "🟢" if tendance == "Haussière" else "🔴"
     rsi_val = round(last["RSI"], 2)
-    macd, signal = compute_macd(prices["price"])
     tech_data.append({
         "Nom": coin_name,
         "Prix (USD)": data.loc[data["id"] == coin_id, "current_price"].values[0],
         "Variation 24h (%)": data.loc[data["id"] == coin_id, "price_change_percentage_24h"].values[0],
         "RSI": rsi_val,
         "Tendance": f"{couleur} {tendance}",
-        "MACD": round(macd.iloc[-1], 2),
-        "Signal": round(signal.iloc[-1], 2)
+        "MACD": round(last["MACD"], 2),
+        "Signal": round(last["Signal"], 2)
     })
 
 df = pd.DataFrame(tech_data)
@@ -98,31 +91,36 @@ def color_percent(val):
     return f"color: {color}"
 
 st.subheader("📊 Indicateurs techniques (24h / 7j / 30j)")
-st.dataframe(
-    df.style.format({
-        "Prix (USD)": "{:,.2f}",
-        "Variation 24h (%)": "{:+.2f}",
-        "RSI": "{:.2f}",
-        "MACD": "{:.2f}",
-        "Signal": "{:.2f}"
-    }).applymap(color_percent, subset=["Variation 24h (%)"]),
-    use_container_width=True
-)
+with section("styler"):
+    st.dataframe(
+        df.style.format({
+            "Prix (USD)": "{:,.2f}",
+            "Variation 24h (%)": "{:+.2f}",
+            "RSI": "{:.2f}",
+            "MACD": "{:.2f}",
+            "Signal": "{:.2f}"
+        }).applymap(color_percent, subset=["Variation 24h (%)"]),
+        use_container_width=True
+    )
 
 st.markdown("---")
 
 # --------------------------------------------------
 # ANALYSE PAR CRYPTO
 # --------------------------------------------------
-for coin_id, coin_name in COINS.items():
+# Le tableau a besoin des indicateurs de toutes les cryptos ; seules les sections visibles sont tracées
+if one_at_a_time:
+    shown = st.radio("Crypto analysée :", list(COINS), format_func=COINS.get, horizontal=True)
+    visible = {shown: COINS[shown]}
+else:
+    visible = COINS
+
+for coin_id, coin_name in visible.items():
+    if coin_id not in matrix.columns:
+        continue
     st.markdown(f"## 📈 {coin_name}")
 
-    prices = get_historical_prices(coin_id, 30)
-    prices["EMA9"] = ema(prices["price"], 9)
-    prices["EMA26"] = ema(prices["price"], 26)
-    prices["RSI"] = compute_rsi(prices["price"])
-    prices["MACD"], prices["Signal"] = compute_macd(prices["price"])
-    prices["SMA"], prices["Upper"], prices["Lower"], prices["Vol"] = compute_bollinger(prices["price"])
+    prices = coin_frame(indicators, coin_id)
 
     current_price = prices["price"].iloc[-1]
     variation_24h = data.loc[data["id"] == coin_id, "price_change_percentage_24h"].values[0]
@@ -141,30 +139,12 @@ for coin_id, coin_name in COINS.items():
         f"{tendance}"
     )
 
-    # Graphique principal
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["price"], mode="lines", name="Prix", line=dict(color="black", width=2)))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA9"], mode="lines", name="EMA 9", line=dict(color="orange")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["EMA26"], mode="lines", name="EMA 26", line=dict(color="cyan")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["Upper"], mode="lines", name="Bande Supérieure", line=dict(color="gray", dash="dot")))
-    fig.add_trace(go.Scatter(x=prices["date"], y=prices["Lower"], mode="lines", name="Bande Inférieure", line=dict(color="gray", dash="dot")))
-    fig.update_layout(title=f"Évolution du prix — {coin_name}", template="plotly_dark", height=450)
-    st.plotly_chart(fig, use_container_width=True)
-
-    # RSI Graph
-    rsi_fig = go.Figure()
-    rsi_fig.add_trace(go.Scatter(x=prices["date"], y=prices["RSI"], mode="lines", name="RSI", line=dict(color="green")))
-    rsi_fig.add_hline(y=70, line_dash="dot", line_color="red")
-    rsi_fig.add_hline(y=30, line_dash="dot", line_color="blue")
-    rsi_fig.update_layout(title="RSI (14 jours)", template="plotly_dark", height=280)
-    st.plotly_chart(rsi_fig, use_container_width=True)
-
-    # MACD Graph
-    macd_fig = go.Figure()
-    macd_fig.add_trace(go.Scatter(x=prices["date"], y=prices["MACD"], name="MACD", line=dict(color="orange")))
-    macd_fig.add_trace(go.Scatter(x=prices["date"], y=prices["Signal"], name="Signal", line=dict(color="blue")))
-    macd_fig.update_layout(title="MACD & Signal", template="plotly_dark", height=280)
-    st.plotly_chart(macd_fig, use_container_width=True)
+    # Prix + EMA + Bollinger, RSI et MACD dans une seule figure
+    fig = coin_figure(prices, f"Évolution du prix — {coin_name}", chart_points, height=1000)
+    with section("plotly"):
+        st.plotly_chart(fig, use_container_width=True)
+    # Historique + indicateurs : fichier produit seulement au clic
+    download_buttons(prices, f"history-{coin_id}", f"{coin_id}_{CURRENCY}_history")
 
     st.markdown("---")
 
@@ -185,3 +165,5 @@ st.markdown("""
 """)
 
 st.caption("💡 Données actualisées automatiquement (API CoinGecko, toutes les 5 minutes)")
+
+end_rerun()
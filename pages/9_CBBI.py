@@ -1,127 +1,74 @@
 # app.py
 """
 Streamlit app pour afficher des statistiques sur le CBBI (Crypto Bitcoin Bull Run Index).
-- Tente l’API JSON publique
+- Synchronise l’API JSON publique dans un historique local (GET conditionnel, dates nouvelles seulement)
 - Si échec, effectue un scrapping HTML pour extraire la valeur “Confidence”
 - Affiche score actuel, graphiques historiques (si données JSON complètes), tableau & export CSV
 """
 
 import streamlit as st
-import requests
 import pandas as pd
-import plotly.express as px
-from datetime import datetime
-from typing import Dict, Any
-from bs4 import BeautifulSoup
+import plotly.graph_objects as go
+from typing import List, Tuple
 
-CBBI_JSON_URL = "https://colintalkscrypto.com/cbbi/data/latest.json"
-CBBI_WEB_URL = "https://colintalkscrypto.com/cbbi/"
+from cbbi import CBBIData, fallback_cbbi, get_store, scrape_confidence, sync_cbbi
+from shared.cache import swr_cache
+from shared.export import download_buttons
+from shared.instrumentation import end_rerun, start_rerun
 
 st.set_page_config(page_title="CBBI — Statistiques", layout="wide")
+start_rerun(__file__)
 
-@st.cache_data(ttl=300)
-def fetch_cbbi_data() -> Dict[str, Any]:
-    """Récupère les données CBBI via JSON ou fallback HTML scrapping."""
-    # 1) tentative API JSON
-    try:
-        resp = requests.get(CBBI_JSON_URL, headers={"Accept": "application/json"}, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        return data
-    except Exception as e:
-        st.warning(f"API JSON inaccessible : {e}. On tente le scrapping web …")
+# (niveau st.*, message) : affichés par la page, le chargement pouvant tourner en tâche de fond
+Notes = List[Tuple[str, str]]
 
-    # 2) fallback scrapping HTML
+def scrape_cbbi_confidence(notes: Notes) -> CBBIData:
+    """Fallback HTML scrapping : seule la valeur « Confidence » (la dernière connue si la page échoue)."""
     try:
-        resp2 = requests.get(CBBI_WEB_URL, timeout=10)
-        resp2.raise_for_status()
-        soup = BeautifulSoup(resp2.text, "html.parser")
-        # chercher un élément contenant la valeur « Confidence »
-        # Note : ce sélecteur peut nécessiter ajustement selon le HTML réel
-        elem = soup.select_one("h1.title.confidence-score-value") or soup.select_one("div.confidence-score-value") or soup.find(string="Confidence").find_next()
-        if elem:
-            # nettoyer le texte pour obtenir un float
-            text = elem.text.strip().replace(",", "").replace("%", "")
-            val = float(text)
-            # créer un JSON minimal
-            return {"Confidence": {"fallback": val}}
-        else:
-            st.error("Élément « Confidence » introuvable dans le HTML.")
-            return {}
+        scraped = scrape_confidence()
     except Exception as e2:
-        st.error(f"Scrapping web échoué aussi : {e2}")
-        return {}
-
-def build_dataframe_from_section(section: Dict[str, Any], name: str) -> pd.Series:
-    idx = []
-    vals = []
-    for k, v in section.items():
-        try:
-            ts = int(k)
-            dt = datetime.utcfromtimestamp(ts)
-        except Exception:
-            try:
-                dt = pd.to_datetime(k)
-            except Exception:
-                continue
-        idx.append(dt)
-        vals.append(v)
-    if not idx:
-        return pd.Series(dtype=float, name=name)
-    s = pd.Series(data=vals, index=pd.DatetimeIndex(idx), name=name).sort_index()
-    return s
-
-def build_master_df(json_data: Dict[str, Any]) -> pd.DataFrame:
-    series_list = []
-    for key, val in json_data.items():
-        if isinstance(val, dict):
-            s = build_dataframe_from_section(val, name=key)
-            if not s.empty:
-                series_list.append(s)
-    if not series_list:
-        return pd.DataFrame()
-    df = pd.concat(series_list, axis=1)
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    return df
+        notes.append(("error", f"Scrapping web échoué aussi : {e2}"))
+        return CBBIData(pd.DataFrame())
+    if scraped.error:
+        notes.append(("warning", f"Scrapping web échoué : {scraped.error}. Dernière valeur connue affichée."))
+    return fallback_cbbi(scraped.value, scraped.scraped_at)
+
+# Périmé après 5 min : servi tout de suite et resynchronisé en fond ; au-delà de 6 h, la page attend
+@swr_cache(soft_ttl=300, hard_ttl=6 * 3600)
+def load_cbbi() -> Tuple[CBBIData, Notes]:
+    """Historique du store local, synchronisé par GET conditionnel : seules les nouvelles dates sont fusionnées."""
+    store = get_store()
+    notes: Notes = []
+    try:
+        sync_cbbi(store)
+    except Exception as e:
+        if store.load().sections:
+            notes.append(("warning", f"API JSON inaccessible : {e}. Affichage de l'historique local."))
+        else:
+            notes.append(("warning", f"API JSON inaccessible : {e}. On tente le scrapping web …"))
+            return scrape_cbbi_confidence(notes), notes
+    return store.load(), notes
 
 # UI
 st.title("CBBI — Statistiques & Visualisation")
 st.markdown("Source des données : Colin Talks Crypto (CBBI). L'application récupère le JSON public du CBBI et/ou effectue un scrapping de secours. Ce n’est pas un conseil financier.")
 
 with st.spinner("Récupération des données…"):
-    data = fetch_cbbi_data()
-
-if not data:
+    cbbi, notes = load_cbbi()
+for level, message in notes:
+    getattr(st, level)(message)
+failure = load_cbbi.refresh_failure()
+if failure:
+    error, computed_at = failure
+    st.warning(f"Resynchronisation échouée : {error}. Données du {pd.Timestamp(computed_at, unit='s'):%Y-%m-%d %H:%M} UTC affichées.")
+
+if not cbbi.sections:
     st.stop()
 
-df = build_master_df(data)
+df = cbbi.frame
 
-# Afficher score de confiance actuel
-latest_cols = {}
-if "Confidence" in data and isinstance(data["Confidence"], dict):
-    try:
-        # si la clé est un timestamp
-        keys = [int(k) for k in data["Confidence"].keys()]
-        keys.sort()
-        last_ts = keys[-1]
-        last_val = data["Confidence"].get(str(last_ts))
-        latest_cols["Confidence"] = (last_val, datetime.utcfromtimestamp(last_ts))
-    except Exception:
-        # fallback “fallback” key
-        if "fallback" in data["Confidence"]:
-            latest_cols["Confidence"] = (data["Confidence"]["fallback"], None)
-
-# Autres variables si présentes (ex: Price)
-if "Price" in data and isinstance(data["Price"], dict):
-    try:
-        keys = [int(k) for k in data["Price"].keys()]
-        keys.sort()
-        last_ts = keys[-1]
-        last_val = data["Price"].get(str(last_ts))
-        latest_cols["Price"] = (last_val, datetime.utcfromtimestamp(last_ts))
-    except Exception:
-        pass
+# Score de confiance actuel et autres variables si présentes (ex: Price)
+latest_cols = {name: cbbi.latest[name] for name in ("Confidence", "Price") if name in cbbi.latest}
 
 col1, col2, col3 = st.columns([1,1,2])
 with col1:
@@ -143,7 +90,7 @@ with col2:
 
 with col3:
     st.markdown("**Sections trouvées dans le JSON**")
-    st.write(sorted(list(data.keys())))
+    st.write(list(cbbi.sections))
 
 st.markdown("---")
 
@@ -156,23 +103,30 @@ else:
     to_plot = st.multiselect("Choisir les séries à tracer", options=cols, default=default_to_plot)
     if to_plot:
         for col in to_plot:
-            fig = px.line(df, x=df.index, y=col, title=f"{col} — historique", labels={"x":"Date (UTC)", col:col})
-            fig.update_layout(margin=dict(l=20, r=20, t=40, b=20), height=320)
+            # go.Scatter sur la seule série : plotly.express recopie et valide tout le DataFrame à chaque rerun
+            series = df[col].dropna()
+            fig = go.Figure(go.Scatter(x=series.index, y=series.to_numpy(), mode="lines", name=col))
+            fig.update_layout(title=f"{col} — historique", xaxis_title="Date (UTC)", yaxis_title=col,
+                              margin=dict(l=20, r=20, t=40, b=20), height=320)
             st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Tableau : dernières valeurs")
-    last_vals = df.ffill().iloc[-1:].T
-    last_vals.columns = ["latest_value"]
-    last_vals["latest_timestamp"] = last_vals.index.map(lambda _: df.index[-1])
+    last_vals = pd.DataFrame(
+        [(name, val, dt) for name, (val, dt) in cbbi.latest.items()],
+        columns=["series", "latest_value", "latest_timestamp"],
+    ).set_index("series")
     st.dataframe(last_vals)
 
     for possible in ("Components", "Component", "SubIndicators", "SubIndicatorsRaw"):
-        if possible in data:
+        if possible in cbbi.extras:
             st.subheader(f"{possible}")
-            st.json(data[possible])
+            st.json(cbbi.extras[possible])
 
-    csv = df.reset_index().rename(columns={"index":"datetime"}).to_csv(index=False)
-    st.download_button("Télécharger CSV (toutes séries)", data=csv, file_name="cbbi_series.csv", mime="text/csv")
+    # Toutes les séries, sérialisées seulement au clic (et une fois par version des données)
+    st.markdown("**Export (toutes séries)**")
+    download_buttons(df, "cbbi", "cbbi_series")
 
 st.markdown("---")
-st.caption("Données provenant du CBBI public — outil combinant plusieurs métriques on‐chain/techniques pour évaluer la confiance dans un pic de bull run. Ce n’est pas un conseil financier.")
\ No newline at end of file
+st.caption("Données provenant du CBBI public — outil combinant plusieurs métriques on‐chain/techniques pour évaluer la confiance dans un pic de bull run. Ce n’est pas un conseil financier.")
+
+end_rerun()
@@ -0,0 +1 @@
+"""Outils communs aux pages et aux paquets de données : mesures, cache, export."""
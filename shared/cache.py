@@ -0,0 +1,131 @@
+"""
+Cache « stale-while-revalidate » partagé par tout le processus.
+
+Une valeur plus vieille que `soft_ttl` est servie telle quelle pendant qu'un
+thread de fond la recalcule : seul un appel sans valeur, ou dont la valeur a
+dépassé `hard_ttl`, attend le calcul. Un rafraîchissement de fond qui échoue
+garde l'ancienne valeur (jusqu'à `hard_ttl`) au lieu de faire échouer la page.
+
+Comme pour `st.cache_data`, les entrées sont rattachées à la fonction (fichier
++ nom qualifié) et non à l'objet décoré : elles survivent à la réexécution du
+script de page à chaque rerun. Contrairement à `st.cache_data`, la valeur
+renvoyée n'est pas copiée : elle est partagée entre les sessions et ne doit
+pas être modifiée.
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .instrumentation import record_cache
+
+# Délai minimal entre deux rafraîchissements de fond après un échec (s)
+RETRY_DELAY = 60
+
+
+class _Entry:
+    __slots__ = ("value", "computed_at", "refreshing", "error", "retry_at")
+
+    def __init__(self, value: Any, computed_at: float):
+        self.value = value
+        self.computed_at = computed_at
+        self.refreshing = False
+        self.error: Optional[Exception] = None
+        self.retry_at = 0.0
+
+
+class _SWRCache:
+    """Entrées d'une fonction décorée, par arguments."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.func: Optional[Callable] = None
+        self.soft_ttl = self.hard_ttl = 0.0
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        # Un seul calcul à la fois par clé : les appels concurrents attendent le même résultat
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _compute(self, key: Hashable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        value = self.func(*args, **kwargs)
+        with self._lock:
+            self._entries[key] = _Entry(value, time.time())
+        return value
+
+    def _revalidate(self, key: Hashable, args: Tuple, kwargs: Dict[str, Any]) -> None:
+        with self._key_lock(key):
+            try:
+                self._compute(key, args, kwargs)
+            except Exception as e:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        entry.refreshing, entry.error = False, e
+                        # Source en échec : pas de nouvel essai à chaque rerun
+                        entry.retry_at = time.time() + min(self.soft_ttl, RETRY_DELAY)
+
+    def get(self, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        key = (args, tuple(sorted(kwargs.items())))
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.computed_at if entry is not None else None
+            if age is not None and age < self.hard_ttl:
+                if age >= self.soft_ttl and not entry.refreshing and now >= entry.retry_at:
+                    entry.refreshing = True
+                    threading.Thread(
+                        target=self._revalidate, args=(key, args, kwargs), name=f"swr-{self.label}", daemon=True
+                    ).start()
+                record_cache(self.label, hit=True)
+                return entry.value
+        record_cache(self.label, hit=False)
+        with self._key_lock(key):
+            # Un autre appel a pu remplir l'entrée pendant l'attente
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.time() - entry.computed_at < self.soft_ttl:
+                    return entry.value
+            return self._compute(key, args, kwargs)
+
+    def refresh_failure(self, args: Tuple, kwargs: Dict[str, Any]) -> Optional[Tuple[Exception, float]]:
+        with self._lock:
+            entry = self._entries.get((args, tuple(sorted(kwargs.items()))))
+            if entry is None or entry.error is None:
+                return None
+            return entry.error, entry.computed_at
+
+
+_caches: Dict[Tuple[str, str], _SWRCache] = {}
+_caches_lock = threading.Lock()
+
+
+def swr_cache(soft_ttl: float, hard_ttl: Optional[float] = None, name: Optional[str] = None) -> Callable:
+    """Décorateur : `soft_ttl` = âge au-delà duquel on rafraîchit en fond, `hard_ttl` = âge maximal servi."""
+    hard_ttl = soft_ttl * 12 if hard_ttl is None else hard_ttl
+    if hard_ttl < soft_ttl:
+        raise ValueError("hard_ttl doit être >= soft_ttl")
+
+    def decorate(f: Callable) -> Callable:
+        with _caches_lock:
+            cache = _caches.setdefault((f.__code__.co_filename, f.__qualname__), _SWRCache(name or f.__qualname__))
+        # La dernière définition l'emporte (script de page réexécuté, éventuellement modifié)
+        cache.func, cache.soft_ttl, cache.hard_ttl = f, soft_ttl, hard_ttl
+
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            return cache.get(args, kwargs)
+
+        def refresh_failure(*args, **kwargs) -> Optional[Tuple[Exception, float]]:
+            """(erreur, date de la valeur servie) si le dernier rafraîchissement de fond a échoué."""
+            return cache.refresh_failure(args, kwargs)
+
+        # À afficher par la page : sinon une valeur périmée n'a aucun signe visible
+        wrapper.refresh_failure = refresh_failure
+        return wrapper
+
+    return decorate
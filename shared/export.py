@@ -0,0 +1,135 @@
+"""
+Export des DataFrames (CSV, Parquet, Arrow) construit seulement au clic.
+
+`download_buttons` passe à `st.download_button` une fonction au lieu des
+octets : aucun rerun ne sérialise l'historique. Le fichier produit est gardé
+par (nom, version des données, format) ; la version est une empreinte légère
+du contenu du DataFrame (`frame_version`).
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from .instrumentation import record_cache, section
+
+# format -> (libellé, type MIME, extension)
+FORMATS: Dict[str, Tuple[str, str, str]] = {
+    "csv": ("CSV", "text/csv", ".csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("Arrow", "application/vnd.apache.arrow.file", ".arrow"),
+}
+
+# Fichiers gardés en mémoire, les plus anciens évincés au-delà de ce total
+MAX_CACHED_BYTES = 128 * 1024 * 1024
+# Lignes écrites par paquet en CSV : pas de chaîne intermédiaire de tout le fichier
+CSV_CHUNK_ROWS = 10_000
+
+
+def available_formats() -> List[str]:
+    """CSV toujours ; Parquet et Arrow si pyarrow est installé."""
+    if find_spec("pyarrow") is None:
+        return ["csv"]
+    return list(FORMATS)
+
+
+def frame_version(frame: pd.DataFrame) -> Hashable:
+    """Empreinte de tout le contenu (colonnes, index, valeurs) : ~1 ms pour 4000 x 11.
+
+    Toute la table est hachée : dans une jointure externe (CBBI), la dernière valeur
+    d'une série peut changer sur une ligne ancienne, pas seulement en fin de table.
+    """
+    rows = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    return (tuple(map(str, frame.columns)), hashlib.blake2b(rows.tobytes(), digest_size=16).hexdigest())
+
+
+def _is_row_numbers(index: pd.Index) -> bool:
+    return isinstance(index, pd.RangeIndex) and index.name is None and index.start == 0 and index.step == 1
+
+
+def serialize(frame: pd.DataFrame, fmt: str, index_label: str = "datetime") -> bytes:
+    """Octets du fichier `fmt` ; l'index devient la première colonne `index_label`.
+
+    Un index par défaut (numéros de ligne, ex. `coin_frame`) n'est pas exporté.
+    """
+    buf = io.BytesIO()
+    table = frame
+    if not _is_row_numbers(frame.index):
+        table = frame.rename_axis(index_label).reset_index()
+    with section("export"):
+        if fmt == "csv":
+            table.to_csv(buf, index=False, chunksize=CSV_CHUNK_ROWS, encoding="utf-8")
+        elif fmt == "parquet":
+            table.to_parquet(buf, index=False)
+        elif fmt == "arrow":
+            table.reset_index(drop=True).to_feather(buf)
+        else:
+            raise ValueError(f"format d'export inconnu : {fmt}")
+    return buf.getvalue()
+
+
+class _ExportCache:
+    """Fichiers déjà produits, par (nom, version, format), bornés en octets."""
+
+    def __init__(self, max_bytes: int = MAX_CACHED_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            data = self._files.get(key)
+            if data is not None:
+                self._files.move_to_end(key)
+        record_cache("export", hit=data is not None)
+        if data is not None:
+            return data
+        data = build()
+        with self._lock:
+            if key not in self._files:
+                self._files[key] = data
+                self._size += len(data)
+            while self._size > self.max_bytes and len(self._files) > 1:
+                _, old = self._files.popitem(last=False)
+                self._size -= len(old)
+        return data
+
+
+_cache = _ExportCache()
+
+
+def exporter(name: str, frame: pd.DataFrame, fmt: str, index_label: str = "datetime") -> Callable[[], bytes]:
+    """Fonction sans argument pour `st.download_button(data=…)` : sérialise au premier clic seulement."""
+    key = (name, frame_version(frame), fmt)
+    return lambda: _cache.get(key, lambda: serialize(frame, fmt, index_label))
+
+
+def download_buttons(
+    frame: pd.DataFrame,
+    name: str,
+    file_stem: str,
+    label: str = "Télécharger",
+    formats: Optional[Iterable[str]] = None,
+    index_label: str = "datetime",
+) -> None:
+    """Un bouton par format ; `name` identifie les données (et les widgets) dans la page."""
+    import streamlit as st
+
+    formats = [fmt for fmt in (formats or FORMATS) if fmt in available_formats()]
+    for col, fmt in zip(st.columns(len(formats)), formats):
+        title, mime, ext = FORMATS[fmt]
+        col.download_button(
+            f"{label} {title}",
+            data=exporter(name, frame, fmt, index_label),
+            file_name=file_stem + ext,
+            mime=mime,
+            key=f"export-{name}-{fmt}",
+            # Pas de rerun au clic : le fichier est produit dans le thread du téléchargement
+            on_click="ignore",
+        )
@@ -0,0 +1,198 @@
+"""
+Mesures par rerun : temps passé par section (HTTP, JSON, indicateurs, Styler,
+Plotly…), octets reçus et efficacité des caches.
+
+Une page appelle `start_rerun(__file__)` en tête ; tout ce qui est mesuré
+ensuite dans le même contexte (y compris les threads de `coingecko.fetch_concurrently`)
+est rattaché à ce rerun. Les mesures hors rerun (collecteur en arrière-plan)
+ne vont que dans les totaux du processus.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional
+
+import pandas as pd
+
+# Nombre de reruns gardés pour la page de diagnostic
+MAX_RERUNS = 200
+
+
+class RerunTrace:
+    """Mesures d'un rerun de page."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.duration = 0.0
+        self.finished = False
+        self.sections: Dict[str, float] = Counter()
+        self.calls: Dict[str, int] = Counter()
+        self.bytes_received = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def _touch(self) -> None:
+        # Sans `end_rerun` (st.stop, exception), la durée s'arrête à la dernière mesure
+        if not self.finished:
+            self.duration = time.perf_counter() - self._t0
+
+    def add_section(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.sections[name] += seconds
+            self.calls[name] += 1
+            self._touch()
+
+    def add_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes_received += n
+            self._touch()
+
+    def add_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            self._touch()
+
+    def finish(self) -> None:
+        with self._lock:
+            self._touch()
+            self.finished = True
+
+    def as_row(self) -> Dict[str, Any]:
+        with self._lock:
+            row = {
+                "page": self.page,
+                "début": pd.Timestamp(self.started_at, unit="s"),
+                "durée (ms)": self.duration * 1000,
+                "octets reçus": self.bytes_received,
+                "cache hits": self.cache_hits,
+                "cache misses": self.cache_misses,
+            }
+            row.update({f"{name} (ms)": seconds * 1000 for name, seconds in self.sections.items()})
+            return row
+
+
+class _Stats:
+    """Totaux du processus, tous reruns et threads confondus."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reruns: Deque[RerunTrace] = deque(maxlen=MAX_RERUNS)
+        self.section_calls: Dict[str, int] = Counter()
+        self.section_total: Dict[str, float] = Counter()
+        self.section_max: Dict[str, float] = Counter()
+        self.bytes_received = 0
+        self.cache_hits: Dict[str, int] = Counter()
+        self.cache_misses: Dict[str, int] = Counter()
+
+
+_stats = _Stats()
+_current: contextvars.ContextVar[Optional[RerunTrace]] = contextvars.ContextVar("coingecko_rerun", default=None)
+
+
+def start_rerun(page: str) -> RerunTrace:
+    """Ouvre la trace du rerun courant (`page` : nom ou chemin du script)."""
+    name = os.path.basename(page)
+    trace = RerunTrace(name[:-3] if name.endswith(".py") else name)
+    _current.set(trace)
+    with _stats.lock:
+        _stats.reruns.append(trace)
+    return trace
+
+
+def end_rerun() -> None:
+    """Ferme la trace courante : la durée inclut alors tout le script."""
+    trace = _current.get()
+    if trace is not None:
+        trace.finish()
+
+
+@contextmanager
+def section(name: str) -> Iterator[None]:
+    """Chronomètre un bloc ; utilisable aussi en décorateur (`@section("indicators")`)."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        with _stats.lock:
+            _stats.section_calls[name] += 1
+            _stats.section_total[name] += elapsed
+            _stats.section_max[name] = max(_stats.section_max[name], elapsed)
+        trace = _current.get()
+        if trace is not None:
+            trace.add_section(name, elapsed)
+
+
+def add_bytes(n: int) -> None:
+    """Octets reçus du réseau."""
+    with _stats.lock:
+        _stats.bytes_received += n
+    trace = _current.get()
+    if trace is not None:
+        trace.add_bytes(n)
+
+
+def record_cache(name: str, hit: bool) -> None:
+    """Compte un accès au cache `name` (servi depuis le cache ou recalculé)."""
+    with _stats.lock:
+        (_stats.cache_hits if hit else _stats.cache_misses)[name] += 1
+    trace = _current.get()
+    if trace is not None:
+        trace.add_cache(hit)
+
+
+# --- lecture (page de diagnostic) ---
+
+def recent_reruns() -> pd.DataFrame:
+    """Derniers reruns, du plus récent au plus ancien."""
+    with _stats.lock:
+        traces = list(_stats.reruns)
+    return pd.DataFrame([t.as_row() for t in reversed(traces)])
+
+
+def section_stats() -> pd.DataFrame:
+    """Sections triées par temps total."""
+    with _stats.lock:
+        rows = [
+            {
+                "section": name,
+                "appels": calls,
+                "total (ms)": _stats.section_total[name] * 1000,
+                "moyenne (ms)": _stats.section_total[name] / calls * 1000,
+                "max (ms)": _stats.section_max[name] * 1000,
+            }
+            for name, calls in _stats.section_calls.items()
+        ]
+    frame = pd.DataFrame(rows, columns=["section", "appels", "total (ms)", "moyenne (ms)", "max (ms)"])
+    return frame.sort_values("total (ms)", ascending=False, ignore_index=True)
+
+
+def cache_stats() -> pd.DataFrame:
+    """Hits, misses et taux de succès par cache."""
+    with _stats.lock:
+        names = sorted(set(_stats.cache_hits) | set(_stats.cache_misses))
+        rows = [(name, _stats.cache_hits[name], _stats.cache_misses[name]) for name in names]
+    frame = pd.DataFrame(rows, columns=["cache", "hits", "misses"])
+    frame["taux de succès"] = frame["hits"] / (frame["hits"] + frame["misses"]).where(lambda n: n > 0)
+    return frame
+
+
+def bytes_received() -> int:
+    with _stats.lock:
+        return _stats.bytes_received
+
+
+def reset() -> None:
+    """Remet tous les compteurs à zéro."""
+    global _stats
+    _stats = _Stats()